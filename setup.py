@@ -51,5 +51,6 @@ setup(
     tests_require=tests_require,
     extras_require={
         'test': tests_require,
+        'xlsx': ['openpyxl>=3.0'],
     },
 )
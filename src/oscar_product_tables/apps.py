@@ -7,3 +7,7 @@ class ProductTablesConfig(OscarConfig):
     name = 'oscar_product_tables'
     verbose_name = _('Product tables')
     namespace = 'oscar_product_tables'
+
+    def ready(self):
+        super().ready()
+        from . import receivers  # noqa: F401
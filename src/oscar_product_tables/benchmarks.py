@@ -0,0 +1,393 @@
+import tracemalloc
+from itertools import cycle
+from time import perf_counter
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpRequest, QueryDict
+from django.template.loader import get_template, render_to_string
+from oscar.core.loading import get_model
+from .dashboard.views import ProductTableAjaxView, ProductTableDataView
+from .export import TableExport
+from .instrumentation import Timings
+from .pagination import KeysetPaginator
+from .query_plan import QueryPlan
+from .renderer import RowRenderer
+from .table import Table
+
+Product = get_model('catalogue', 'Product')
+
+__all__ = ['measure', 'count_queries', 'compare_layouts',
+           'compare_query_counts', 'page_latencies', 'export_throughput',
+           'compare_pruning', 'get_scenarios', 'profile', 'run_scenarios',
+           'compare_baseline', 'compare_renderers', 'compare_chunk_sizes',
+           'compare_query_plans']
+
+
+def measure(func, *args, **kwargs):
+    """
+    :returns: Tuple of the result, wall time in seconds, memory in bytes that
+        is still held by the result and peak memory in bytes of calling func
+    """
+    tracemalloc.start()
+    start = perf_counter()
+    try:
+        result = func(*args, **kwargs)
+        duration = perf_counter() - start
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, duration, retained, peak
+
+
+def count_queries(func, *args, **kwargs):
+    """ :returns: Tuple of the result and the number of queries of func """
+    timings = Timings()
+    with timings.phase('count'):
+        result = func(*args, **kwargs)
+    return result, timings.queries
+
+
+def get_request(user=None, method='get', path='/', data=None):
+    """
+    :returns: Request to call a view with directly, without middlewares
+    :param user: Default AnonymousUser
+    """
+    request = HttpRequest()
+    request.method = method.upper()
+    request.path = request.path_info = path
+    request.META.update({'SERVER_NAME': 'localhost', 'SERVER_PORT': '80'})
+    query = QueryDict(mutable=True)
+    for key, value in (data or {}).items():
+        query[key] = str(value)
+    setattr(request, request.method, query)
+    request.user = user or AnonymousUser()
+    return request
+
+
+def render_page(queryset, **table_kwargs):
+    """ Builds the table and renders it like a page of the table view """
+    request = get_request()
+    table = Table(queryset=queryset, **table_kwargs)
+    return render_to_string('product_tables/table_page.html', {
+        'table': table,
+        'request': request,
+    })
+
+
+def read_cells(table):
+    """ Reads every cell like row.html, the table keeps what it caches """
+    for row in table.rows:
+        for cell in row.cells:
+            if cell.enabled:
+                cell.data
+    return table
+
+
+def build_columnar(queryset, **table_kwargs):
+    return read_cells(Table(queryset=queryset, **table_kwargs))
+
+
+def compare_layouts(queryset, layouts=None, **table_kwargs):
+    """
+    Builds the table over the queryset in the columnar layout and in other
+    layouts and reads every cell like a render does, to compare the memory
+    the layouts hold afterwards.
+
+    :param layouts: Dict of {name: function that builds the table of a
+        queryset and returns it with read_cells}
+    """
+    build_columnar(queryset.all(), **table_kwargs)  # Warm up caches
+    results = {}
+    layouts = {'columnar': build_columnar, **(layouts or {})}
+    for name, func in layouts.items():
+        duration, retained, peak = measure(
+            func, queryset.all(), **table_kwargs)[1:]
+        results[name] = {
+            'seconds': duration,
+            'retained_memory': retained,
+            'peak_memory': peak,
+        }
+    return results
+
+
+def compare_query_counts(queryset, **table_kwargs):
+    """
+    Renders a page of half of the products and a page of all products. Both
+    need the same number of queries unless cells run queries on their own.
+
+    :returns: Dict of {row count: query count}
+    """
+    ids = list(queryset.values_list('id', flat=True))
+    model = queryset.model
+    render_page(model.objects.filter(id__in=ids), **table_kwargs)  # Warm up
+    results = {}
+    for size in (len(ids) // 2, len(ids)):
+        qs = model.objects.filter(id__in=ids[:size])
+        results[size] = count_queries(render_page, qs, **table_kwargs)[1]
+    return results
+
+
+def page_latencies(queryset, per_page, **table_kwargs):
+    """
+    Walks all keyset pages like the htmx page chain does
+
+    :returns: List of seconds per page
+    """
+    paginator = KeysetPaginator(queryset, per_page)
+    latencies = []
+    number, cursor = 1, None
+    while True:
+        start = perf_counter()
+        page = paginator.page(number, cursor)
+        render_page(page.object_list, **table_kwargs)
+        latencies.append(perf_counter() - start)
+        if not page.has_next():
+            return latencies
+        number, cursor = page.next_page_number(), page.next_cursor
+
+
+def compare_pruning(queryset, **table_kwargs):
+    """
+    Renders the products with the attribute cols of every product class and
+    with only those of the product classes in the queryset
+
+    :returns: Dict of {name: {'cols', 'bytes', 'seconds'}}
+    """
+    ids = list(queryset.values_list('id', flat=True))
+    queryset = queryset.model.objects.filter(id__in=ids)
+    render_page(queryset.all(), **table_kwargs)  # Warm up
+    results = {}
+    for name, scope in (('all', None), ('pruned', queryset)):
+        table = Table(queryset=queryset.none(), scope=scope, **table_kwargs)
+        html, duration = measure(
+            render_page, queryset.all(), scope=scope, **table_kwargs)[:2]
+        results[name] = {
+            'cols': len(table.cols),
+            'bytes': len(html.encode()),
+            'seconds': duration,
+        }
+    return results
+
+
+def consume_export(export, file_format):
+    """ :returns: Size of the export, in characters for csv """
+    return sum(len(block) for block in export.iter_format(file_format))
+
+
+def export_throughput(queryset, file_format='csv', chunk_size=500,
+                      **table_kwargs):
+    """
+    Exports the queryset and measures the rows per second. Peak memory stays
+    the same for any catalog size when the chunking works.
+    """
+    ids = list(queryset.values_list('id', flat=True))
+    queryset = queryset.model.objects.filter(id__in=ids)
+    export = TableExport(queryset, chunk_size=chunk_size, **table_kwargs)
+    size, duration, retained, peak = measure(
+        consume_export, export, file_format)
+    rows = len(ids)
+    return {
+        'rows': rows,
+        'size': size,
+        'seconds': duration,
+        'rows_per_second': rows / duration if duration else 0,
+        'peak_memory': peak,
+    }
+
+
+def profile(func, repeat=3):
+    """
+    Calls func once to warm up caches, then measures it
+
+    :returns: Dict with the fastest of repeat 'seconds', the 'queries' and
+        the 'peak_memory' in bytes of one call
+    """
+    func()
+    durations = []
+    for _ in range(repeat):
+        start = perf_counter()
+        func()
+        durations.append(perf_counter() - start)
+    return {
+        'seconds': min(durations),
+        'queries': count_queries(func)[1],
+        'peak_memory': measure(func)[3],
+    }
+
+
+def consume_response(response):
+    """ :returns: Size of the rendered or streamed response in bytes """
+    if getattr(response, 'streaming', False):
+        return sum(len(block) for block in response.streaming_content)
+    if hasattr(response, 'render'):
+        response.render()
+    return len(response.content)
+
+
+def get_scenarios(category, user, product, code, values):
+    """
+    The paths of a table request: building the table, rendering a page, the
+    Json view and getting and saving the form of one cell. The views are
+    called directly, so no url configuration is needed.
+
+    :param user: Superuser the views are requested by
+    :param code: Code of the cell of the product that is requested and saved
+    :param values: Values that are saved in turn
+    :returns: Dict of {name: callable}
+    """
+    categories = category.get_descendants_and_self()
+    ids = list(Product.objects.browsable_dashboard().filter(
+        categories__in=categories).values_list('id', flat=True))
+    queryset = Product.objects.filter(id__in=ids).order_by('title')
+    path = f'/{product.pk}/{code}/'
+    values = cycle(values)
+
+    def request(method, data=None):
+        return get_request(user, method, path, data)
+
+    def ajax_save():
+        return consume_response(ProductTableAjaxView.as_view()(
+            request('post', {
+                'productid': product.pk,
+                'code': code,
+                code: next(values),
+            }),
+            product_id=product.pk, code=code, action='save'))
+
+    return {
+        'table': lambda: Table(queryset=queryset.all()),
+        'page': lambda: render_page(queryset.all(), scope=queryset),
+        'data_view': lambda: consume_response(
+            ProductTableDataView.as_view()(request('get'),
+                                           slug=category.slug)),
+        'ajax_get': lambda: consume_response(
+            ProductTableAjaxView.as_view()(request('get'),
+                                           product_id=product.pk, code=code)),
+        'ajax_save': ajax_save,
+    }
+
+
+def run_scenarios(scenarios, repeat=3):
+    """ :returns: Dict of {name: result of profile} """
+    return {name: profile(func, repeat) for name, func in scenarios.items()}
+
+
+def compare_baseline(results, baseline, tolerance=0.25):
+    """
+    Flags scenarios that run more queries than the baseline or that are
+    slower or need more memory by more than the tolerance. Differences below
+    the noise floors, 5ms and 64 KiB, are not flagged.
+
+    :returns: List of messages, one per regression
+    """
+    floors = {'seconds': 0.005, 'peak_memory': 64 * 1024}
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name, None)
+        if previous is None:
+            continue
+        if result['queries'] > previous['queries']:
+            regressions.append('{}: {} queries, baseline {}'.format(
+                name, result['queries'], previous['queries']))
+        for key, floor in floors.items():
+            if result[key] - previous[key] > max(
+                    previous[key] * tolerance, floor):
+                regressions.append('{}: {} {:.0%} above the baseline'.format(
+                    name, key, result[key] / previous[key] - 1))
+    return regressions
+
+
+def compare_renderers(queryset, user=None, **table_kwargs):
+    """
+    Renders the rows of one table with row.html and with the RowRenderer
+
+    :param user: Rows of superusers link to the dashboard, others to the shop
+    :returns: Dict of {name: seconds} and whether the html is identical
+    """
+    request = get_request(user)
+    table = Table(queryset=queryset, **table_kwargs)
+    template = get_template('product_tables/row.html')
+    renderers = {
+        'template': lambda: [template.render(
+            {'row': row, 'request': request}) for row in table.rows],
+        'python': lambda: RowRenderer(request).render_rows(table.rows),
+    }
+    results = {}
+    html = {}
+    for name, render in renderers.items():
+        render()  # Warm up
+        start = perf_counter()
+        html[name] = render()
+        results[name] = perf_counter() - start
+    results['identical'] = html['template'] == html['python']
+    return results
+
+
+def consume_chunks(queryset, chunk_size, **table_kwargs):
+    """ :returns: Number of rows, the table holds one chunk at a time """
+    table = Table(queryset=queryset.none(), **table_kwargs)
+    count = 0
+    for rows in table.iter_chunks(queryset, chunk_size):
+        for row in rows:
+            list(row.cells)
+        count += len(rows)
+    return count
+
+
+def compare_chunk_sizes(queryset, chunk_sizes=(50, 200, 1000),
+                        **table_kwargs):
+    """
+    Walks all rows of the queryset in chunks and once in one table. Peak
+    memory of the chunks depends on their size, the one of the single table
+    on the queryset.
+
+    :returns: Dict of {chunk size or 'all': {'seconds', 'peak_memory'}}
+    """
+    ids = list(queryset.values_list('id', flat=True))
+    queryset = queryset.model.objects.filter(id__in=ids).order_by('pk')
+    Table(queryset=queryset.all(), **table_kwargs)  # Warm up
+    results = {}
+    for chunk_size in chunk_sizes:
+        duration, retained, peak = measure(
+            consume_chunks, queryset.all(), chunk_size, **table_kwargs)[1:]
+        results[chunk_size] = {'seconds': duration, 'peak_memory': peak}
+    duration, retained, peak = measure(
+        build_columnar, queryset.all(), **table_kwargs)[1:]
+    results['all'] = {'seconds': duration, 'peak_memory': peak}
+    return results
+
+
+def count_columns(queryset):
+    """ :returns: Number of columns the queryset selects """
+    return len(queryset.query.get_compiler(queryset.db).get_select()[0])
+
+
+def compare_query_plans(queryset, codes=(None, ['title'])):
+    """
+    Builds tables of all cols and of some codes with the products loaded
+    with only the fields of the query plan and with all fields
+
+    :returns: Dict of {name: {'seconds', 'queries', 'columns'}}
+    """
+    ids = list(queryset.values_list('id', flat=True))
+    queryset = queryset.model.objects.filter(id__in=ids).order_by('pk')
+    Table(queryset=queryset.all())  # Warm up
+    results = {}
+    enabled = QueryPlan.enabled
+    try:
+        for only in (True, False):
+            QueryPlan.enabled = only
+            for table_codes in codes:
+                (table, queries), duration = measure(
+                    count_queries, Table, queryset=queryset.all(),
+                    codes=table_codes)[:2]
+                name = '{} cols, {}'.format(
+                    'all' if table_codes is None else ' '.join(table_codes),
+                    'visible fields' if only else 'all fields')
+                results[name] = {
+                    'seconds': duration,
+                    'queries': queries,
+                    'columns': count_columns(table.products),
+                }
+    finally:
+        QueryPlan.enabled = enabled
+    return results
@@ -0,0 +1,38 @@
+from time import time_ns
+from django.core.cache import caches
+
+__all__ = ['VersionedCache']
+
+
+class VersionedCache:
+    """
+    Entries in one of django's caches whose keys contain a version, so all
+    of them are invalidated at once by bumping it
+    """
+    version_key = None
+
+    def __init__(self, alias=None, timeout=None):
+        self.alias = alias
+        self.timeout = timeout
+
+    @property
+    def enabled(self):
+        return self.alias is not None
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def get_version(self):
+        version = self.cache.get(self.version_key)
+        if version is None:
+            self.cache.add(self.version_key, time_ns(), None)
+            version = self.cache.get(self.version_key)
+        return version
+
+    def invalidate_all(self):
+        if self.enabled:
+            try:
+                self.cache.incr(self.version_key)
+            except ValueError:
+                self.cache.set(self.version_key, time_ns(), None)
@@ -0,0 +1,72 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from oscar.core.loading import get_model
+from .models import ProductTableChange
+
+Product = get_model('catalogue', 'Product')
+StockRecord = get_model('partner', 'StockRecord')
+
+__all__ = ['ChangeLog', 'change_log']
+
+
+class ChangeLog:
+    """
+    Finds the products whose table data changed since a time by the indexed
+    date_updated of products and stockrecords and a ProductTableChange per
+    product for everything else: attribute values, categories, deletions and
+    the bulk saves of the table. Changes are looked up overlap seconds
+    earlier, so transactions that committed late are not missed.
+    """
+    def __init__(self, enabled=False, overlap=2, limit=500):
+        self.enabled = enabled
+        self.overlap = overlap
+        self.limit = limit
+
+    def log(self, product_ids):
+        """ Sets the time of the change, one entry per product """
+        product_ids = set(product_ids)
+        now = timezone.now()
+        with transaction.atomic():
+            ProductTableChange.objects.filter(
+                product_id__in=product_ids).update(date_changed=now)
+            ProductTableChange.objects.bulk_create([
+                ProductTableChange(product_id=pk, date_changed=now)
+                for pk in product_ids], ignore_conflicts=True)
+
+    def log_on_commit(self, *product_ids):
+        """
+        Logs after the transaction is committed, so the time of the entries
+        is after the changes are visible
+        """
+        if self.enabled and product_ids:
+            transaction.on_commit(lambda: self.log(product_ids))
+
+    def get_changed(self, since, using=None):
+        """
+        Every query stops after limit products, more changes than that are
+        better loaded again as a whole
+
+        :param using: Database alias, None routes as usual
+        :returns: Set of ids of the products that changed after since
+        """
+        since = since - timedelta(seconds=self.overlap)
+        changed = set()
+        for qs in (
+            ProductTableChange.objects.db_manager(using).filter(
+                date_changed__gt=since).values_list('product_id', flat=True),
+            Product.objects.db_manager(using).filter(
+                date_updated__gt=since).values_list('pk', flat=True),
+            StockRecord.objects.db_manager(using).filter(
+                date_updated__gt=since).values_list('product_id', flat=True),
+        ):
+            changed.update(qs.order_by()[:self.limit + 1])
+        return changed
+
+
+change_log = ChangeLog(
+    enabled=getattr(settings, 'PRODUCT_TABLES_CHANGE_LOG', False),
+    overlap=getattr(settings, 'PRODUCT_TABLES_CHANGE_LOG_OVERLAP', 2),
+    limit=getattr(settings, 'PRODUCT_TABLES_DELTA_LIMIT', 500),
+)
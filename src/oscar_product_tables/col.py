@@ -1,16 +1,72 @@
 
- 
+
 class Col:
-    def __init__(self, code, name):
+    """
+    A column of the table
+
+    The plugin that owns the column fills it with one raw value and one
+    enabled flag per row, so the table does not need an object per cell.
+    """
+    def __init__(self, code, name, obj=None):
         self.code = code
         self.name = name
         self.title = name
+        self.obj = obj
+        self.plugin = None
+        self.descriptor = None
+        self.values = []
+        self.enabled = bytearray()
+
+    def append(self, value, enabled=True):
+        self.values.append(value)
+        self.enabled.append(enabled)
+
+    def clear(self):
+        self.values = []
+        self.enabled = bytearray()
+
+    def get_search_q(self, value):
+        """ :returns: Q object on Product matching value or None """
+        return self.plugin.get_search_q(self, value)
+
+    def get_order_by(self):
+        """ :returns: Expression the products can be ordered by or None """
+        return self.plugin.get_order_by(self)
 
-    def filter(self, product_qs):
-        return product_qs
+    def filter(self, product_qs, value=None):
+        if not value:
+            return product_qs
+        q = self.get_search_q(value)
+        if q is None:
+            return product_qs.none()
+        return product_qs.filter(q)
 
     def __repr__(self):
         return 'Col:' + str(self)
 
     def __str__(self):
         return self.code
+
+
+class ColDescriptor:
+    """
+    Everything a cell needs to know about its col, compiled once per table
+
+    :param accessor: Gets the raw value out of the row source of the plugin
+    :param formatter: Turns the raw value into the displayed value
+    :param field_factory: Returns the form field(s) for a raw value
+    :param choices: Dict of choices or None
+    """
+    __slots__ = ('accessor', 'formatter', 'field_factory', 'choices')
+
+    def __init__(self, accessor, formatter=None, field_factory=None,
+                 choices=None):
+        self.accessor = accessor
+        self.formatter = formatter
+        self.field_factory = field_factory
+        self.choices = choices
+
+    def format(self, value):
+        if self.formatter is None:
+            return value
+        return self.formatter(value)
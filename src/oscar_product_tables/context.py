@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.contrib.sites.models import Site
+from django.utils.functional import cached_property
+from .instrumentation import instrumentation
+from .read_database import read_database
+
+__all__ = ['TableContext']
+
+
+class TableContext:
+    """
+    Request scoped configuration, resolved once and shared by the table, its
+    plugins and cells
+
+    :param using: Database alias the table reads from, None routes the
+        queries as usual
+    """
+    def __init__(self, request=None, site=None, timings=None, using=None):
+        self.request = request
+        self.site = site or Site.objects.get_current(request)
+        self.using = using
+        self.timings = timings or instrumentation.start(self.aliases)
+
+    @property
+    def aliases(self):
+        """ Databases the table reads from, the primary has the writes """
+        return sorted({read_database.primary, self.using} - {None})
+
+    @cached_property
+    def configuration(self):
+        """ Domain specific configuration of the site or None """
+        return getattr(self.site, 'configuration', None)
+
+    @cached_property
+    def mode(self):
+        if self.configuration is None:
+            return None
+        return self.configuration.product_table_mode
+
+    @cached_property
+    def show_sku(self):
+        if self.configuration:
+            return getattr(self.configuration, 'own_upc', False)
+        return getattr(settings, 'DATATABLES_SHOW_SKU', False)
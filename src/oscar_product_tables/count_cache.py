@@ -0,0 +1,32 @@
+from django.conf import settings
+from .cache import VersionedCache
+
+__all__ = ['CountCache', 'count_cache']
+
+
+class CountCache(VersionedCache):
+    """
+    Number of products per category that the paginator estimates the pages
+    by. Products that are deleted or join or leave a category bump the
+    version, otherwise the counts live for the timeout.
+    """
+    version_key = 'product_tables:count:version'
+
+    def get_key(self, name):
+        return f'product_tables:count:{self.get_version()}:{name}'
+
+    def get_or_set(self, name, default):
+        """ :param default: Callable that counts the products on a miss """
+        if not self.enabled:
+            return default()
+        return self.cache.get_or_set(self.get_key(name), default, self.timeout)
+
+    def set(self, name, count):
+        if self.enabled:
+            self.cache.set(self.get_key(name), count, self.timeout)
+
+
+count_cache = CountCache(
+    alias=getattr(settings, 'PRODUCT_TABLES_COUNT_CACHE', None),
+    timeout=getattr(settings, 'PRODUCT_TABLES_COUNT_TIMEOUT', 300),
+)
@@ -1,3 +1,5 @@
+import asyncio
+from django import VERSION as DJANGO_VERSION
 from django.urls import path
 from oscar.core.application import OscarDashboardConfig
 
@@ -16,6 +18,37 @@ class ProductTablesDashboardConfig(OscarDashboardConfig):
         self.product_table_view = views.ProductTableView
         self.product_table_view_ajax = views.ProductTableAjaxView
         self.product_table_data_view = views.ProductTableDataView
+        self.product_table_delta_view = views.ProductTableDeltaView
+        self.product_table_batch_view = views.ProductTableBatchView
+        self.product_table_export_view = views.ProductTableExportView
+        self.product_table_facet_view = views.ProductTableFacetView
+        self.product_table_option_view = views.ProductTableOptionView
+        self.product_table_import_view = views.ProductTableImportView
+        self.product_table_server_side_view = views.ProductTableServerSideView
+        self.product_table_async_view = views.ProductTableAsyncView
+
+    def get_url_decorator(self, pattern):
+        """
+        The permission decorators are sync, for async views the check runs
+        in sync_to_async on a stand in view before the view is awaited
+        """
+        decorator = super().get_url_decorator(pattern)
+        if decorator is None \
+                or not asyncio.iscoroutinefunction(pattern.callback):
+            return decorator
+
+        from asgiref.sync import sync_to_async
+
+        def async_decorator(view):
+            check = sync_to_async(decorator(lambda *args, **kwargs: None))
+
+            async def wrapped_view(request, *args, **kwargs):
+                response = await check(request, *args, **kwargs)
+                if response is not None:
+                    return response
+                return await view(request, *args, **kwargs)
+            return wrapped_view
+        return async_decorator
 
     def get_urls(self):
         urls =[
@@ -44,9 +77,59 @@ class ProductTablesDashboardConfig(OscarDashboardConfig):
                 '<int:product_id>/<slug:code>/<slug:action>/',
                 self.product_table_view_ajax.as_view()
             ),
+            path(
+                'batch/save/',
+                self.product_table_batch_view.as_view(),
+                name='product-table-batch'
+            ),
             path(
                 'json/<slug:slug>/',
                 self.product_table_data_view.as_view()
             ),
+            path(
+                'delta/<slug:slug>/',
+                self.product_table_delta_view.as_view(),
+                name='product-table-delta'
+            ),
+            path(
+                'facets/<slug:slug>/<slug:code>/',
+                self.product_table_facet_view.as_view(),
+                name='product-table-facets'
+            ),
+            path(
+                'options/<int:group_id>/',
+                self.product_table_option_view.as_view(),
+                name='product-table-options'
+            ),
+            path(
+                'export/<slug:slug>/',
+                self.product_table_export_view.as_view(),
+                name='product-table-export'
+            ),
+            path(
+                'import/upload/',
+                self.product_table_import_view.as_view(),
+                name='product-table-import'
+            ),
+            path(
+                'server-side/<slug:slug>/',
+                self.product_table_server_side_view.as_view(),
+                name='product-table-server-side'
+            ),
         ]
+        if DJANGO_VERSION >= (3, 1):
+            # Async views need django 3.1. Before the slug of the table view,
+            # which matches async/ too
+            urls[1:1] = [
+                path(
+                    'async/',
+                    self.product_table_async_view.as_view(),
+                    name='product-table-async'
+                ),
+                path(
+                    'async/<slug:slug>/',
+                    self.product_table_async_view.as_view(),
+                    name='product-table-async'
+                ),
+            ]
         return self.post_process_urls(urls)
@@ -1,16 +1,43 @@
+import asyncio
 import json
+try:
+    from asgiref.sync import sync_to_async
+except ImportError:  # Django 2.2, the async views are not routed
+    sync_to_async = None
 from django.views.generic.base import TemplateView, View
 from django.views.generic.edit import FormView
-from django.core.paginator import Paginator
-from django.http.response import JsonResponse
+from django.core.paginator import InvalidPage
+from django.http import Http404
+from django.db.models import F, Q
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http.response import JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.template.loader import get_template
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+from django.utils.http import urlencode
+from django.utils.html import format_html
 from django.utils.safestring import mark_safe
-from django.contrib.sites.models import Site
 from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, PermissionDenied
 from oscar_product_tables.forms import ProductFieldForm
 from oscar.core.loading import get_model
 from oscar_product_tables.plugins import *
+from ..change_log import change_log
+from ..context import TableContext
+from ..export import TableExport
+from ..facet_cache import facet_cache
+from ..importer import TableImport
+from ..instrumentation import instrumentation
+from ..option_index import option_index
 from ..forms import TableConfigForm
+from ..pagination import KeysetPaginator
+from ..read_database import read_database
+from ..renderer import RowRenderer
+from ..row_cache import row_cache
 from ..table import Table
+from ..templatetags.display_datatype_filters import display
 
 Product = get_model('catalogue', 'Product')
 Category = get_model('catalogue', 'Category')
@@ -23,8 +50,15 @@ class GetTableMixin:
     template_name = 'product_tables/dashboard/product_table.html'
     template_name_table = 'product_tables/table.html'
     template_name_table_page = 'product_tables/table_page.html'
+    template_name_row = 'product_tables/row.html'
     paginate_by = getattr(settings, 'PRODUCT_TABLES_PAGINATE_BY', 9999999999999)
+    server_side = getattr(settings, 'PRODUCT_TABLES_SERVER_SIDE', False)
+    fast_rows = getattr(settings, 'PRODUCT_TABLES_FAST_ROWS', False)
+    chunk_concurrency = getattr(
+        settings, 'PRODUCT_TABLES_CHUNK_CONCURRENCY', 0)
+    delta_interval = getattr(settings, 'PRODUCT_TABLES_DELTA_INTERVAL', 30)
     categories = []
+    slug = None
 
     def get_plugin_classes(self):
         return [
@@ -36,10 +70,28 @@ class GetTableMixin:
     def get_disabled_plugins(self):
         return []
 
+    @cached_property
+    def read_database(self):
+        """ Alias the request reads from, see ReadDatabase """
+        return read_database.get_alias(self.request)
+
+    @cached_property
+    def table_context(self):
+        """ Resolves site configuration once per request """
+        return TableContext(self.request, using=self.read_database)
+
+    @cached_property
+    def primary_context(self):
+        """ Context of tables that read from the primary, e.g. for caches """
+        if self.read_database is None:
+            return self.table_context
+        return TableContext(self.request, site=self.table_context.site,
+                            timings=self.table_context.timings,
+                            using=read_database.primary)
+
     def get_read_only_plugins(self):
-        site = Site.objects.get_current()
-        if site and hasattr(site, 'configuration'):
-            mode = site.configuration.product_table_mode
+        if self.table_context.configuration is not None:
+            mode = self.table_context.mode
             plugins = [*self.get_plugin_classes()]
             if mode == 20:
                 plugins = []
@@ -57,30 +109,133 @@ class GetTableMixin:
         kwargs = {'plugin_classes': []}
         if hasattr(self, 'product'):
             kwargs.update({'product': self.product})
+        if self.categories:
+            # Only the attribute cols of the category's product classes
+            kwargs['scope'] = self.get_category_queryset()
         kwargs.update(additional_kwargs)
         kwargs['read_only'] = self.get_read_only_plugins()
         kwargs['disabled'] = self.get_disabled_plugins()
+        kwargs.setdefault('context', self.table_context)
         return kwargs
 
+    def get_category_queryset(self):
+        if self.categories:
+            return self.get_queryset().filter(
+                categories__in=self.categories).distinct()
+        return self.get_queryset().none()
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['table_enabled'] = bool(self.categories)
-        if self.categories:
-            qs = self.get_queryset().filter(categories__in=self.categories).distinct()
+        context['server_side'] = self.server_side
+        qs = self.get_category_queryset()
+        if self.server_side and not 'page' in self.request.GET:
+            # The rows are requested by DataTables
+            context['table'] = self.get_table(queryset=qs.none())
+            context['form'] = TableConfigForm(self.request)
+            return context
+        if self.chunk_concurrency and not 'page' in self.request.GET:
+            # The rows are requested in parallel by the manifest
+            context.update(self.get_delta_context())
+            context['table'] = self.get_table(queryset=qs.none())
+            context['manifest'] = self.get_manifest(qs)
+            context['chunk_concurrency'] = self.chunk_concurrency
+            context['progress'] = 0
+            context['form'] = TableConfigForm(self.request)
+            return context
+        context['chunked'] = 'chunk' in self.request.GET
+        page = self.get_page(qs)
+        if row_cache.enabled and 'page' in self.request.GET:
+            # Rows that go into the shared cache are read from the primary
+            context['table'] = self.get_table(
+                queryset=qs.none(), context=self.primary_context)
+            context['rendered_rows'] = self.get_rendered_rows(
+                context['table'], page.pks)
         else:
-            qs = self.get_queryset().none()
-        paginator = Paginator(qs, self.paginate_by)
-        site_nr = self.request.GET.get('page', 1)
-        page = paginator.page(site_nr)
-        context['table'] = self.get_table(queryset=page.object_list)
+            context['table'] = self.get_table(queryset=page.object_list)
+            if self.fast_rows and 'page' in self.request.GET:
+                context['rendered_rows'] = self.render_rows(
+                    context['table'].rows)
         context['page'] = page
-        context['progress'] = int(page.number / page.paginator.num_pages * 100)
+        context['progress'] = page.progress
         if not 'page' in self.request.GET:
             context['form'] = TableConfigForm(self.request)
+            context.update(self.get_delta_context())
         return context
 
+    def get_delta_context(self):
+        """
+        The token of the first delta sync is taken before the rows are read,
+        changes made while they load are sent again
+        """
+        if not change_log.enabled or not self.delta_interval \
+                or self.server_side:
+            return {}
+        return {
+            'delta_since': timezone.now().isoformat(),
+            'delta_interval': self.delta_interval,
+        }
+
+    def get_paginator(self, queryset):
+        return KeysetPaginator(queryset, self.paginate_by,
+                               cache_key=self.slug)
+
+    def get_rendered_rows(self, table, pks):
+        """
+        Takes the rows from the row cache and only loads and renders the
+        products that are missing there
+
+        :returns: List of html in the order of pks
+        """
+        variant = row_cache.get_variant(table, self.request.user)
+        entries = row_cache.get_many(pks)
+        rendered = {pk: variants[variant] for pk, variants in entries.items()
+                    if variant in variants}
+        missing = [pk for pk in pks if pk not in rendered]
+        if missing:
+            updates = {}
+            rows = table.extend(Product.objects.filter(pk__in=missing))
+            for row, html in zip(rows, self.render_rows(rows)):
+                pk = row.product.pk
+                rendered[pk] = html
+                updates[pk] = {**entries.get(pk, {}), variant: html}
+            row_cache.set_many(updates)
+        return [mark_safe(rendered[pk]) for pk in pks if pk in rendered]
+
+    def render_rows(self, rows):
+        """
+        :returns: List of the html of the rows, rendered by row.html or with
+            PRODUCT_TABLES_FAST_ROWS by the RowRenderer to the same html
+        """
+        with self.table_context.timings.phase('render-rows'):
+            if self.fast_rows:
+                return RowRenderer(self.request).render_rows(rows)
+            template = get_template(self.template_name_row)
+            return [template.render({'row': row, 'request': self.request})
+                    for row in rows]
+
+    def get_manifest(self, queryset):
+        """ :returns: List of urls of independently loadable pages """
+        cursors = self.get_paginator(queryset).get_cursors()
+        return [self.request.path + '?' + urlencode({
+            'page': number,
+            'cursor': cursor or '',
+            'chunk': 1,
+        }) for number, cursor in enumerate(cursors, 1)]
+
+    def get_page(self, queryset):
+        paginator = self.get_paginator(queryset)
+        try:
+            return paginator.page(self.request.GET.get('page', 1),
+                                  self.request.GET.get('cursor', None))
+        except InvalidPage as error:
+            raise Http404(str(error))
+
     def get_queryset(self):
-        return Product.objects.browsable_dashboard().order_by('title')
+        qs = Product.objects.browsable_dashboard().order_by('title')
+        if self.read_database is not None:
+            qs = qs.using(self.read_database)
+        return qs
 
     def get_template_names(self):
         if 'page' in self.request.GET:
@@ -90,29 +245,97 @@ class GetTableMixin:
     def user_is_allowed(self, user):
         return user.is_superuser
 
-    def dispatch(self, request, *args, slug=None, **kwargs):
+    def prepare(self, request, slug=None):
+        """ Checks the user and resolves the categories of the slug """
         if not self.user_is_allowed(request.user):
-            raise AttributeError('Not allowed for user ' + request.user)
+            raise PermissionDenied(f'Not allowed for user {request.user}')
         if slug:
-            category = Category.objects.get(slug=slug)
+            self.slug = slug
+            category = Category.objects.db_manager(
+                self.read_database).get(slug=slug)
             self.categories = category.get_descendants_and_self()
-        return super().dispatch(request, *args, **kwargs)
+
+    def dispatch(self, request, *args, slug=None, **kwargs):
+        self.prepare(request, slug)
+        response = super().dispatch(request, *args, **kwargs)
+        return self.instrument(response)
+
+    def instrument(self, response):
+        """
+        Renders the response in a timed phase, adds the Server-Timing header
+        and reports the timings of the request. Streamed responses are
+        reported once they are consumed, their header misses the stream.
+        """
+        timings = self.table_context.timings
+        if not timings.enabled:
+            return response
+        if hasattr(response, 'render') and not response.is_rendered:
+            with timings.phase('render'):
+                response.render()
+        if instrumentation.server_timing and timings.phases:
+            response['Server-Timing'] = timings.header()
+        if response.streaming:
+            response.streaming_content = instrumentation.report_after(
+                timings, response.streaming_content, self.request)
+        else:
+            instrumentation.report(timings, self.request)
+        return response
+
+
+class AsyncTableMixin:
+    """
+    Async handlers for GetTableMixin views under ASGI. The ORM is sync, so the
+    tables are built in sync_to_async, in the thread of the request, and the
+    worker serves other requests meanwhile. Before django 4.1 class based
+    views can not be async, as_view wraps them in a coroutine function.
+    """
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        if asyncio.iscoroutinefunction(view):
+            return view
+
+        async def async_view(request, *args, **kwargs):
+            return await view(request, *args, **kwargs)
+
+        async_view.view_class = view.view_class
+        async_view.view_initkwargs = view.view_initkwargs
+        return async_view
+
+    async def dispatch(self, request, *args, slug=None, **kwargs):
+        await sync_to_async(self.prepare)(request, slug)
+        method = request.method.lower()
+        handler = self.http_method_not_allowed
+        if method in self.http_method_names:
+            handler = getattr(self, method, handler)
+        response = handler(request, *args, **kwargs)
+        if asyncio.iscoroutine(response):
+            response = await response
+        return await sync_to_async(self.instrument)(response)
 
 
 class ProductTableView(GetTableMixin, TemplateView):
     http_method_names = ['get']
 
 
+class ProductTableAsyncView(AsyncTableMixin, ProductTableView):
+    """ The table page and its fragments for ASGI """
+    async def get(self, request, *args, **kwargs):
+        context = await sync_to_async(self.get_context_data)(**kwargs)
+        return self.render_to_response(context)
+
+
 class ProductTableAjaxView(GetTableMixin, FormView):
     http_method_names = ['get', 'post']
     form_class = ProductFieldForm
 
     def setup(self, request, product_id, code, *args, **kwargs):
-        self.product = Product.objects.get(id=product_id)
+        super().setup(request, *args, **kwargs)
+        self.product = Product.objects.db_manager(
+            self.read_database).get(id=product_id)
         self.code = code
         self.previous_data = None
-        self.table = self.get_table()
-        super().setup(request, *args, **kwargs)
+        self.table = self.get_table(codes=[code])
 
     def get_context_data(self, **kwargs):
         context = FormView.get_context_data(self, **kwargs)
@@ -146,16 +369,98 @@ class ProductTableAjaxView(GetTableMixin, FormView):
             if form.is_valid():
                 self.previous_data = form.cell.data
                 form.save()
+                read_database.pin(request)
                 # Reinitialize table to get new field data
-                self.table = self.get_table()
+                self.table = self.get_table(codes=[code])
                 return self.get(request, product_id, code, *args, **kwargs)
         return super().post(request, *args, **kwargs)
 
 
+class ProductTableBatchView(GetTableMixin, View):
+    """
+    Saves many cells in one request. The Json body has a list of edits like
+    {"edits": [{"productid": 1, "code": "color", "values": {"color": 2}}]},
+    the values are validated by the same form as single cells. Nothing is
+    saved when an edit is invalid, otherwise every plugin saves its edits in
+    bulk inside one transaction.
+    """
+    http_method_names = ['post']
+
+    def post(self, request, *args, **kwargs):
+        try:
+            edits = self.get_edits(request.body)
+        except ValueError as error:
+            return JsonResponse({'error': str(error)}, status=400)
+        pks = {edit['productid'] for edit in edits}
+        codes = list({edit['code'] for edit in edits})
+        table = self.get_table(
+            queryset=Product.objects.filter(pk__in=pks), codes=codes)
+        changes, errors = self.validate(table, edits)
+        if errors:
+            return JsonResponse({'errors': errors}, status=400)
+        table.save_many(changes)
+        read_database.pin(request)
+        table = self.get_table(
+            queryset=Product.objects.filter(pk__in=pks), codes=codes)
+        return JsonResponse({'cells': [
+            self.render_cell(table, edit) for edit in edits]})
+
+    @staticmethod
+    def get_edits(body):
+        try:
+            edits = json.loads(body)['edits']
+            return [{
+                'productid': int(edit['productid']),
+                'code': str(edit['code']),
+                'values': dict(edit.get('values', {})),
+            } for edit in edits]
+        except (KeyError, TypeError, ValueError) as error:
+            raise ValueError(f'Invalid edits: {error}')
+
+    def validate(self, table, edits):
+        """ :returns: Tuple of [(cell, data), ...] and a list of errors """
+        changes = []
+        errors = []
+        for edit in edits:
+            cell = self.get_cell(table, edit)
+            if cell is None:
+                errors.append({**edit, 'errors': {'code': ['Unknown cell']}})
+            elif not cell.enabled or cell.read_only:
+                errors.append({**edit, 'errors': {'code': ['Not editable']}})
+            else:
+                form = ProductFieldForm(cell, self.request, data={
+                    'productid': edit['productid'],
+                    'code': edit['code'],
+                    **edit['values'],
+                })
+                if form.is_valid():
+                    changes.append((cell, form.get_cell_data()))
+                else:
+                    errors.append({**edit, 'errors': form.errors})
+        return changes, errors
+
+    @staticmethod
+    def get_cell(table, edit):
+        row = table.row_index.get(edit['productid'], None)
+        if row is None:
+            return None
+        return table.get_field(row.product, edit['code'])
+
+    def render_cell(self, table, edit):
+        cell = self.get_cell(table, edit)
+        return {
+            'productid': edit['productid'],
+            'code': edit['code'],
+            'value': display(cell.data) if cell is not None else '',
+        }
+
+
 class ProductTableDataView(GetTableMixin, View):
     """ Table content as Json, currently unused """
     http_method_names = ['get']
     paginate_by = None
+    streaming = getattr(settings, 'PRODUCT_TABLES_STREAM_JSON', False)
+    chunk_size = getattr(settings, 'PRODUCT_TABLES_CHUNK_SIZE', 500)
 
     @staticmethod
     def clean(value):
@@ -177,8 +482,292 @@ class ProductTableDataView(GetTableMixin, View):
             data.append(row_dict)
         return data#json.dumps(data)
 
+    def iter_json_chunks(self, queryset):
+        """
+        Yields the rows of every chunk of products as Json without brackets,
+        one table loads the chunks so only one of them is held in memory
+        """
+        table = self.get_table(queryset=Product.objects.none(), scope=None)
+        for rows in table.iter_chunks(queryset.order_by('pk'),
+                                      self.chunk_size):
+            json_data = self.build_json(rows)
+            if json_data:
+                yield json.dumps(json_data, cls=DjangoJSONEncoder)[1:-1]
+
+    def stream_json(self, queryset):
+        """ Same document as the JsonResponse, emitted chunk by chunk """
+        yield '{"data": ['
+        separator = ''
+        for json_rows in self.iter_json_chunks(queryset):
+            yield separator + json_rows
+            separator = ', '
+        yield ']}'
+
     def get(self, request, *args, **kwargs):
-        additional_kwargs = {'queryset': Product.objects.browsable_dashboard()}
-        table = self.get_table(**additional_kwargs)
+        # All products, so the cols are not limited to the category (scope)
+        queryset = Product.objects.browsable_dashboard()
+        if self.streaming:
+            return StreamingHttpResponse(
+                self.stream_json(queryset), content_type='application/json')
+        table = self.get_table(queryset=queryset, scope=None)
         json_data = self.build_json(table.rows)
         return JsonResponse({'data': json_data})
+
+
+class ProductTableFacetView(GetTableMixin, View):
+    """
+    Distinct values of one col with their product counts as Json, for the
+    filter dropdowns. Counted per category and cached until the next write.
+    """
+    http_method_names = ['get']
+
+    def get(self, request, *args, code=None, **kwargs):
+        table = self.get_table(queryset=Product.objects.none(), codes=[code])
+        col = table.col_index.get(code, None)
+        if col is None:
+            raise Http404(f'Unknown col {code}')
+        queryset = (self.get_category_queryset() if self.categories
+                    else self.get_queryset())
+        facets = facet_cache.get_or_set(
+            f'{self.slug}:{code}',
+            lambda: col.plugin.get_facets(col, queryset))
+        if facets is None:
+            raise Http404(f'No facets for {code}')
+        return JsonResponse({'code': code, 'facets': facets})
+
+
+class ProductTableOptionView(GetTableMixin, View):
+    """
+    Options of a group that contain the term, one page as Json in the
+    format of select2's ajax transport
+    """
+    http_method_names = ['get']
+
+    def get(self, request, *args, group_id=None, **kwargs):
+        try:
+            page = int(request.GET.get('page', 1))
+        except ValueError:
+            page = 1
+        options, more = option_index.search(
+            group_id, request.GET.get('term', ''), page)
+        return JsonResponse({
+            'results': [{'id': pk, 'text': option} for pk, option in options],
+            'pagination': {'more': more},
+        })
+
+
+class ProductTableDeltaView(GetTableMixin, View):
+    """
+    Rows of the category that changed since the token of the last request,
+    rendered like the rows of the table pages, and the ids of the rows to
+    remove. Clients patch their table and send the new token next time.
+    """
+    http_method_names = ['get']
+
+    @cached_property
+    def read_database(self):
+        """ Changes missing on a lagging replica would be skipped for good """
+        return read_database.primary if read_database.enabled else None
+
+    def get(self, request, *args, **kwargs):
+        if not change_log.enabled:
+            raise Http404('The change log is disabled')
+        token = timezone.now()
+        try:
+            since = parse_datetime(request.GET.get('since', ''))
+        except ValueError:
+            since = None
+        if since is None:
+            return JsonResponse({'error': 'Invalid since'}, status=400)
+        changed = change_log.get_changed(since, self.read_database)
+        if len(changed) > change_log.limit:
+            return JsonResponse({'since': token.isoformat(), 'reload': True})
+        table = self.get_table(
+            queryset=self.get_category_queryset().filter(pk__in=changed))
+        return JsonResponse({
+            'since': token.isoformat(),
+            'reload': False,
+            'rows': [{'productid': row.product.pk, 'html': html}
+                     for row, html in zip(table.rows,
+                                          self.render_rows(table.rows))],
+            'removed': sorted(changed - set(table.row_index)),
+        })
+
+
+class ProductTableExportView(GetTableMixin, View):
+    """ Streams the products of the category as csv or ?format=xlsx """
+    http_method_names = ['get']
+    chunk_size = getattr(settings, 'PRODUCT_TABLES_CHUNK_SIZE', 500)
+
+    def get(self, request, *args, **kwargs):
+        file_format = request.GET.get('format', 'csv')
+        if file_format not in TableExport.formats:
+            raise Http404(f'Unknown format {file_format}')
+        export = TableExport(self.get_category_queryset(),
+                             chunk_size=self.chunk_size,
+                             **self.get_table_kwargs())
+        try:
+            content = export.iter_format(file_format)
+        except ImproperlyConfigured as error:
+            raise Http404(str(error))
+        response = StreamingHttpResponse(
+            content, content_type=TableExport.content_types[file_format])
+        response['Content-Disposition'] = \
+            f'attachment; filename="{self.slug}.{file_format}"'
+        return response
+
+
+class ProductTableImportView(GetTableMixin, View):
+    """
+    Imports the uploaded file of the export layout, with dry_run the changes
+    are only reported
+    """
+    http_method_names = ['post']
+    chunk_size = getattr(settings, 'PRODUCT_TABLES_CHUNK_SIZE', 500)
+    true_values = ('1', 'true', 'on', 'yes')
+
+    def get_dry_run(self):
+        """ Checkboxes send on, scripts 1 or true, anything else imports """
+        value = self.request.POST.get('dry_run', '')
+        return value.strip().lower() in self.true_values
+
+    def post(self, request, *args, **kwargs):
+        file = request.FILES.get('file', None)
+        if file is None:
+            return JsonResponse({'error': 'No file'}, status=400)
+        file_format = 'xlsx' if file.name.endswith('.xlsx') else 'csv'
+        importer = TableImport(chunk_size=self.chunk_size,
+                               dry_run=self.get_dry_run(),
+                               **self.get_table_kwargs())
+        try:
+            result = importer.run(file, file_format)
+        except (ImproperlyConfigured, ValueError) as error:
+            return JsonResponse({'error': str(error)}, status=400)
+        if result['changes'] and not result['errors'] \
+                and not importer.dry_run:
+            read_database.pin(request)
+        return JsonResponse(result, status=400 if result['errors'] else 200)
+
+
+class ProductTableServerSideView(GetTableMixin, View):
+    """
+    Speaks the server-side processing protocol of DataTables: searching,
+    ordering and paging happen on the product queryset, only the requested
+    page is loaded and rendered.
+    """
+    http_method_names = ['get']
+
+    def get(self, request, *args, **kwargs):
+        params = request.GET
+        queryset = self.get_category_queryset()
+        cols = self.get_table(queryset=queryset.none()).cols
+        records_total = queryset.count()
+        queryset = self.search(queryset, cols, params)
+        records_filtered = queryset.count()
+        queryset = self.order(queryset, cols, params)
+        start = self.get_int(params, 'start', 0)
+        length = self.get_int(params, 'length', 25)
+        if length >= 0:
+            queryset = queryset[start:start + length]
+        table = self.get_table(queryset=queryset)
+        return JsonResponse({
+            'draw': self.get_int(params, 'draw', 0),
+            'recordsTotal': records_total,
+            'recordsFiltered': records_filtered,
+            'data': [self.build_row(row) for row in table.rows],
+        })
+
+    @staticmethod
+    def get_int(params, key, default):
+        try:
+            return int(params.get(key, default))
+        except ValueError:
+            return default
+
+    @staticmethod
+    def get_columns(cols, params):
+        """ :returns: List of (col, column params) as sent by DataTables """
+        cols = {col.code: col for col in cols}
+        columns = []
+        index = 0
+        while f'columns[{index}][data]' in params:
+            prefix = f'columns[{index}]'
+            col = cols.get(params[f'{prefix}[data]'], None)
+            if col is not None:
+                columns.append((col, {
+                    'index': index,
+                    'searchable': params.get(f'{prefix}[searchable]') != 'false',
+                    'orderable': params.get(f'{prefix}[orderable]') != 'false',
+                    'search': params.get(f'{prefix}[search][value]', ''),
+                }))
+            index += 1
+        return columns or [(col, {'index': index, 'searchable': True,
+                                  'orderable': True, 'search': ''})
+                           for index, col in enumerate(cols.values())]
+
+    def search(self, queryset, cols, params):
+        columns = self.get_columns(cols, params)
+        value = params.get('search[value]', '').strip()
+        if value:
+            q = Q()
+            for col, column in columns:
+                if column['searchable']:
+                    col_q = col.get_search_q(value)
+                    if col_q is not None:
+                        q |= col_q
+            queryset = queryset.filter(q) if q else queryset.none()
+        for col, column in columns:
+            queryset = col.filter(queryset, column['search'].strip())
+        return queryset
+
+    def order(self, queryset, cols, params):
+        columns = {column['index']: (col, column)
+                   for col, column in self.get_columns(cols, params)}
+        order_by = []
+        index = 0
+        while f'order[{index}][column]' in params:
+            col, column = columns.get(
+                self.get_int(params, f'order[{index}][column]', -1),
+                (None, None))
+            descending = params.get(f'order[{index}][dir]') == 'desc'
+            index += 1
+            if col is None or not column['orderable']:
+                continue
+            expression = col.get_order_by()
+            if expression is None:
+                continue
+            alias = f'order_{index}'
+            queryset = queryset.annotate(**{alias: expression})
+            order_by.append(F(alias).desc(nulls_last=True) if descending
+                            else F(alias).asc(nulls_last=True))
+        if not order_by:
+            return queryset
+        return queryset.order_by(*order_by, 'pk')
+
+    def build_row(self, row):
+        row_dict = {
+            'DT_RowAttr': {'data-productid': row.product.id},
+            'cells': {},
+        }
+        for cell in row.cells:
+            row_dict[cell.code] = self.render_cell(row, cell)
+            if not cell.enabled:
+                state = 'disabled'
+            elif cell.read_only or cell.code == 'upc':
+                state = 'read_only'
+            else:
+                state = 'editable'
+            row_dict['cells'][cell.code] = state
+        return row_dict
+
+    def render_cell(self, row, cell):
+        if not cell.enabled:
+            return 'n/a'
+        if cell.code == 'upc':
+            if self.request.user.is_superuser:
+                url = reverse('dashboard:catalogue-product', args=(row.product.id,))
+            else:
+                url = row.product.get_absolute_url()
+            return format_html('<a href="{}" target="__blank">{}</a>',
+                               url, display(cell.data))
+        return display(cell.data)
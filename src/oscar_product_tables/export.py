@@ -0,0 +1,103 @@
+import csv
+from tempfile import TemporaryFile
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.functional import Promise
+from oscar.core.loading import get_model
+from .table import Table
+
+Product = get_model('catalogue', 'Product')
+
+__all__ = ['TableExport']
+
+
+class Echo:
+    """ File like object for csv.writer that returns the line """
+    def write(self, value):
+        return value
+
+
+class TableExport:
+    """
+    Writes the cols of the table plugins as CSV or XLSX rows. The table loads
+    the products chunk by chunk, so memory does not grow with the catalog.
+    """
+    formats = ['csv', 'xlsx']
+    content_types = {
+        'csv': 'text/csv',
+        'xlsx': ('application/vnd.openxmlformats-officedocument.'
+                 'spreadsheetml.sheet'),
+    }
+
+    def __init__(self, queryset, chunk_size=500, **table_kwargs):
+        self.queryset = queryset
+        self.chunk_size = chunk_size
+        self.table_kwargs = table_kwargs
+
+    def get_table(self, queryset):
+        return Table(queryset=queryset, **self.table_kwargs)
+
+    def get_rows(self):
+        """ Yields lists of values, the first one is the header """
+        table = self.get_table(Product.objects.none())
+        yield ['productid', *[col.code for col in table.cols]]
+        chunks = table.iter_chunks(self.queryset.order_by('pk'),
+                                   self.chunk_size)
+        for rows in chunks:
+            for row in rows:
+                yield [row.product.pk, *[
+                    self.clean(cell.col.plugin.get_export_value(cell))
+                    if cell.enabled else None
+                    for cell in row.cells
+                ]]
+
+    @staticmethod
+    def clean(value):
+        """ Lazy translations, like choice labels, are written as text """
+        if isinstance(value, Promise):
+            return str(value)
+        return value
+
+    def iter_csv(self):
+        """ Yields the csv one chunk of lines at a time """
+        writer = csv.writer(Echo())
+        lines = []
+        for row in self.get_rows():
+            lines.append(writer.writerow(row))
+            if len(lines) >= self.chunk_size:
+                yield ''.join(lines)
+                lines = []
+        if lines:
+            yield ''.join(lines)
+
+    @staticmethod
+    def get_workbook():
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            raise ImproperlyConfigured(
+                'XLSX export needs openpyxl, install the xlsx extra')
+        return Workbook(write_only=True)
+
+    def iter_xlsx(self, workbook, block_size=64 * 1024):
+        """
+        XLSX is a zip file that can not be streamed while it is written.
+        openpyxl writes it to a temporary file in write only mode, which is
+        then streamed in blocks.
+        """
+        sheet = workbook.create_sheet()
+        for row in self.get_rows():
+            sheet.append(row)
+        with TemporaryFile() as file:
+            workbook.save(file)
+            file.seek(0)
+            while True:
+                block = file.read(block_size)
+                if not block:
+                    return
+                yield block
+
+    def iter_format(self, file_format):
+        """ :raises ImproperlyConfigured: When openpyxl is missing for xlsx """
+        if file_format == 'xlsx':
+            return self.iter_xlsx(self.get_workbook())
+        return self.iter_csv()
@@ -0,0 +1,25 @@
+from django.conf import settings
+from .cache import VersionedCache
+
+__all__ = ['FacetCache', 'facet_cache']
+
+
+class FacetCache(VersionedCache):
+    """
+    Distinct values with their product counts per category and col. Every
+    write to products, their values or stockrecords bumps the version.
+    """
+    version_key = 'product_tables:facets:version'
+
+    def get_or_set(self, name, default):
+        """ :param default: Callable that counts the facets on a miss """
+        if not self.enabled:
+            return default()
+        key = f'product_tables:facets:{self.get_version()}:{name}'
+        return self.cache.get_or_set(key, default, self.timeout)
+
+
+facet_cache = FacetCache(
+    alias=getattr(settings, 'PRODUCT_TABLES_FACET_CACHE', None),
+    timeout=getattr(settings, 'PRODUCT_TABLES_FACET_CACHE_TIMEOUT', 300),
+)
@@ -0,0 +1,184 @@
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+from django.db import transaction
+from oscar.core.loading import get_model
+
+Product = get_model('catalogue', 'Product')
+ProductClass = get_model('catalogue', 'ProductClass')
+ProductAttribute = get_model('catalogue', 'ProductAttribute')
+ProductAttributeValue = get_model('catalogue', 'ProductAttributeValue')
+AttributeOption = get_model('catalogue', 'AttributeOption')
+AttributeOptionGroup = get_model('catalogue', 'AttributeOptionGroup')
+Category = get_model('catalogue', 'Category')
+ProductCategory = get_model('catalogue', 'ProductCategory')
+Partner = get_model('partner', 'Partner')
+StockRecord = get_model('partner', 'StockRecord')
+
+__all__ = ['generate_catalog']
+
+ATTRIBUTE_TYPES = [
+    'text', 'option', 'integer', 'multi_option', 'float', 'boolean', 'date',
+    'richtext',
+]
+
+
+class CatalogGenerator:
+    """
+    Creates a synthetic catalog to benchmark the table on. The same seed
+    creates the same values, products are written with bulk_create.
+    """
+    def __init__(self, products=1000, product_classes=5, attributes=8,
+                 partners=3, options=8, seed=0, prefix='bench'):
+        self.products = products
+        self.product_classes = product_classes
+        self.attributes = attributes
+        self.partners = partners
+        self.options = options
+        self.random = random.Random(seed)
+        self.prefix = prefix
+        self.groups = {}
+
+    def generate(self):
+        """ :returns: The category that holds all products """
+        with transaction.atomic():
+            groups = self.groups = self.create_option_groups()
+            classes = self.create_product_classes(groups)
+            partners = self.create_partners()
+            category = Category.add_root(
+                name=self.prefix.title(), slug=self.prefix)
+            products = self.create_products(classes, category)
+            self.create_attribute_values(products, classes, groups)
+            self.create_stockrecords(products, partners)
+        return category
+
+    def create_option_groups(self):
+        """ :returns: Dict of {attribute type: [option, ...]} """
+        groups = {}
+        for kind in ('option', 'multi_option'):
+            group = AttributeOptionGroup.objects.create(
+                name=f'{self.prefix} {kind}')
+            AttributeOption.objects.bulk_create([
+                AttributeOption(group=group, option=f'{kind} {number}')
+                for number in range(self.options)])
+            groups[kind] = list(group.options.order_by('pk'))
+        return groups
+
+    def create_product_classes(self, groups):
+        """
+        Every class has its own attributes, the codes repeat across classes
+        like in catalogs where many classes share e.g. a color.
+
+        :returns: Dict of {product_class: [attribute, ...]}
+        """
+        classes = {}
+        for number in range(self.product_classes):
+            product_class = ProductClass.objects.create(
+                name=f'{self.prefix} class {number}',
+                slug=f'{self.prefix}-class-{number}',
+            )
+            classes[product_class] = [
+                self.create_attribute(product_class, code, groups)
+                for code in range(number, number + self.attributes)]
+        return classes
+
+    def create_attribute(self, product_class, code, groups):
+        attribute_type = ATTRIBUTE_TYPES[code % len(ATTRIBUTE_TYPES)]
+        options = groups.get(attribute_type, None)
+        return ProductAttribute.objects.create(
+            product_class=product_class,
+            name=f'Attribute {code}',
+            code=f'{self.prefix}{code}',
+            type=attribute_type,
+            option_group=options[0].group if options else None,
+        )
+
+    def create_partners(self):
+        return [Partner.objects.create(
+            name=f'{self.prefix} partner {number}',
+            code=f'{self.prefix}-partner-{number}',
+        ) for number in range(self.partners)]
+
+    def create_products(self, classes, category):
+        product_classes = list(classes)
+        Product.objects.bulk_create([Product(
+            title=f'{self.prefix.title()} product {number}',
+            slug=f'{self.prefix}-product-{number}',
+            upc=f'{self.prefix.upper()}{number:07d}',
+            product_class=product_classes[number % len(product_classes)],
+            structure=Product.STANDALONE,
+            is_public=True,
+        ) for number in range(self.products)], batch_size=500)
+        products = list(Product.objects.filter(
+            upc__startswith=self.prefix.upper()).select_related(
+                'product_class').order_by('pk'))
+        ProductCategory.objects.bulk_create([
+            ProductCategory(product=product, category=category)
+            for product in products], batch_size=500)
+        return products
+
+    def get_value(self, attribute, groups):
+        choose = self.random
+        return {
+            'text': lambda: f'Text {choose.randint(0, 999)}',
+            'richtext': lambda: f'<p>Text {choose.randint(0, 999)}</p>',
+            'integer': lambda: choose.randint(0, 10000),
+            'float': lambda: round(choose.uniform(0, 100), 2),
+            'boolean': lambda: choose.random() < 0.5,
+            'date': lambda: date(2020, 1, 1) + timedelta(
+                days=choose.randint(0, 1000)),
+            'option': lambda: choose.choice(groups['option']),
+            'multi_option': lambda: choose.sample(
+                groups['multi_option'], choose.randint(1, 3)),
+        }[attribute.type]()
+
+    def create_attribute_values(self, products, classes, groups):
+        values = []
+        multi_options = []
+        for product in products:
+            for attribute in classes[product.product_class]:
+                if self.random.random() < 0.1:  # Some values are missing
+                    continue
+                value = self.get_value(attribute, groups)
+                item = ProductAttributeValue(
+                    product=product, attribute=attribute)
+                if attribute.type == 'multi_option':
+                    multi_options.append((item, value))
+                else:
+                    setattr(item, f'value_{attribute.type}', value)
+                values.append(item)
+        ProductAttributeValue.objects.bulk_create(values, batch_size=500)
+        if multi_options:
+            # bulk_create returns no pks on every database
+            qs = ProductAttributeValue.objects.filter(
+                product__in=products, attribute__type='multi_option')
+            pks = {(product_id, attribute_id): pk for product_id, attribute_id,
+                   pk in qs.values_list('product_id', 'attribute_id', 'pk')}
+            through = ProductAttributeValue.value_multi_option.through
+            through.objects.bulk_create([through(
+                productattributevalue_id=pks[
+                    item.product_id, item.attribute_id],
+                attributeoption_id=option.pk,
+            ) for item, options in multi_options for option in options],
+                batch_size=500)
+
+    def create_stockrecords(self, products, partners):
+        StockRecord.objects.bulk_create([StockRecord(
+            product=product,
+            partner=partner,
+            partner_sku=f'{product.upc}-{number}',
+            price=Decimal(self.random.randint(100, 100000)) / 100,
+            num_in_stock=self.random.randint(0, 100),
+        ) for product in products
+            for number, partner in enumerate(partners)
+            if self.random.random() < 0.8], batch_size=500)
+
+
+def generate_catalog(**kwargs):
+    """
+    Creates products, product classes with attributes of all editable types
+    and partners with stockrecords, see CatalogGenerator
+
+    :returns: The category that holds all products
+    """
+    return CatalogGenerator(**kwargs).generate()
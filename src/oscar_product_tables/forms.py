@@ -6,15 +6,72 @@ from django.urls.base import reverse
 Category = get_model('catalogue', 'Category')
 
 
+class RemoteOptionsMixin:
+    """
+    Renders only the selected options, select2 loads the others page by
+    page from the option search of the group
+    """
+    url_name = 'product_tables_dashboard:product-table-options'
+
+    def __init__(self, group_id, attrs=None):
+        attrs = {
+            **(attrs or {}),
+            'data-options-url': reverse(self.url_name, args=[group_id]),
+        }
+        super().__init__(attrs)
+
+    def optgroups(self, name, value, attrs=None):
+        selected = [pk for pk in value if pk not in ('', None)]
+        queryset = self.choices.queryset.filter(pk__in=selected) \
+            if selected else []
+        options = [self.create_option(
+            name, obj.pk, self.choices.field.label_from_instance(obj), True,
+            index) for index, obj in enumerate(queryset)]
+        if not self.allow_multiple_selected:
+            options.insert(0, self.create_option(
+                name, '', self.choices.field.empty_label or '', not selected,
+                len(options)))
+        return [(None, options, 0)]
+
+
+class RemoteSelect(RemoteOptionsMixin, forms.Select):
+    pass
+
+
+class RemoteSelectMultiple(RemoteOptionsMixin, forms.SelectMultiple):
+    pass
+
+
+def remote_option_field(attribute):
+    """
+    Like the option fields of oscar's ProductForm, but the widget renders
+    only the selected options
+    """
+    group = attribute.option_group
+    if attribute.type == 'multi_option':
+        field_class, widget = (forms.ModelMultipleChoiceField,
+                               RemoteSelectMultiple(group.pk))
+    else:
+        field_class, widget = forms.ModelChoiceField, RemoteSelect(group.pk)
+    return field_class(
+        label=attribute.name,
+        required=attribute.required,
+        queryset=group.options.all(),
+        widget=widget,
+    )
+
+
 class ProductFieldForm(forms.Form):
-    def __init__(self, cell, request):
-        self.url = request.path
+    def __init__(self, cell, request=None, data=None):
+        self.url = request.path if request is not None else None
         self.code = cell.code
         self.name = cell.name
         #pylint: disable=invalid-name
         auto_id = 'id_%s_' + str(cell.product.id)
         self.id = 'form_' + auto_id % (self.code,)
-        if request.method == 'POST':
+        if data is not None:
+            super().__init__(data, auto_id=auto_id)
+        elif request is not None and request.method == 'POST':
             super().__init__(request.POST, auto_id=auto_id)
         else:
             super().__init__(auto_id=auto_id)
@@ -36,10 +93,13 @@ class ProductFieldForm(forms.Form):
         )
         self.fields.update(self.get_fields())
 
-    def save(self):
+    def get_cell_data(self):
+        """ :returns: Cleaned data of the fields that belong to the cell """
         field_codes = self.cell.fields.keys()
-        data = {k: v for k, v in self.cleaned_data.items() if k in field_codes}
-        self.cell.save(**data)
+        return {k: v for k, v in self.cleaned_data.items() if k in field_codes}
+
+    def save(self):
+        self.cell.save(**self.get_cell_data())
 
 
 class TableConfigForm(forms.Form):
@@ -0,0 +1,147 @@
+import codecs
+import csv
+from itertools import islice
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from oscar.core.loading import get_model
+from .export import TableExport
+from .forms import ProductFieldForm
+from .table import Table
+
+Product = get_model('catalogue', 'Product')
+
+__all__ = ['TableImport']
+
+
+class TableImport:
+    """
+    Imports a csv or xlsx file laid out like the export: a header with the
+    productid, or else the upc, and the col codes, then one product per line.
+
+    Every chunk of lines is compared with the current values of one table,
+    only the changed cells are validated by the form of the cell and saved
+    in bulk. Nothing is saved when a cell is invalid or on a dry run.
+    """
+    formats = TableExport.formats
+    keys = {'productid': 'pk', 'upc': 'upc'}
+
+    def __init__(self, chunk_size=500, dry_run=False, **table_kwargs):
+        self.chunk_size = chunk_size
+        self.dry_run = dry_run
+        self.table_kwargs = table_kwargs
+
+    def read_rows(self, file, file_format):
+        """ :param file: Binary file; yields lists of values per line """
+        if file_format == 'xlsx':
+            try:
+                from openpyxl import load_workbook
+            except ImportError:
+                raise ImproperlyConfigured(
+                    'XLSX import needs openpyxl, install the xlsx extra')
+            sheet = load_workbook(file, read_only=True).active
+            for row in sheet.iter_rows(values_only=True):
+                yield ['' if value is None else value for value in row]
+        else:
+            yield from csv.reader(codecs.iterdecode(file, 'utf-8-sig'))
+
+    def get_chunks(self, rows):
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def run(self, file, file_format='csv'):
+        """
+        :returns: Dict with the number of rows, a list of changes and a list
+            of errors, each with the line in the file
+        :raises ValueError: When the header has no productid or upc
+        """
+        rows = iter(self.read_rows(file, file_format))
+        header = [str(code or '').strip() for code in next(rows, [])]
+        key = next((key for key in self.keys if key in header), None)
+        if key is None:
+            raise ValueError('The header needs a productid or upc column')
+        codes = [code for code in header
+                 if code and code != key and code != 'productid']
+        result = {'rows': 0, 'changes': [], 'errors': []}
+        table = Table(queryset=Product.objects.none(), codes=codes,
+                      **self.table_kwargs)
+        for code in codes:
+            if code not in table.col_index:
+                self.add_error(result, 1, None, code, 'Unknown column')
+        with transaction.atomic():
+            for chunk in self.get_chunks(rows):
+                self.import_chunk(key, header, codes, chunk, result)
+            if result['errors']:
+                transaction.set_rollback(True)
+        return result
+
+    def import_chunk(self, key_code, header, codes, chunk, result):
+        items = [dict(zip(header, row)) for row in chunk]
+        keys = [str(item.get(key_code, '')).strip() for item in items]
+        lookup = self.keys[key_code]
+        values = keys
+        if lookup == 'pk':
+            values = [key for key in keys if key.isdigit()]
+        table = Table(
+            queryset=Product.objects.filter(**{f'{lookup}__in': values}),
+            codes=codes, **self.table_kwargs)
+        rows = {str(getattr(row.product, lookup)): row for row in table.rows}
+        compare_fields = {col.code: self.get_compare_fields(col)
+                          for col in table.cols}
+        changes = []
+        first_line = result['rows'] + 2  # After the header
+        for line, (key, item) in enumerate(zip(keys, items), first_line):
+            row = rows.get(key, None)
+            if row is None:
+                self.add_error(result, line, key, key_code,
+                               'Unknown product')
+                continue
+            for col in table.cols:
+                cell = col.plugin.get_cell(row, col)
+                data = col.plugin.get_import_data(col, item.get(col.code, ''))
+                initial = col.plugin.get_initial(cell)
+                fields = compare_fields[col.code]
+                if not any(fields[name].has_changed(initial.get(name), value)
+                           for name, value in data.items() if name in fields):
+                    continue
+                if not cell.enabled or cell.read_only:
+                    self.add_error(result, line, key, col.code, 'Not editable')
+                    continue
+                form = ProductFieldForm(cell, data={
+                    'productid': row.product.pk,
+                    'code': col.code,
+                    **initial,
+                    **data,
+                })
+                if not form.is_valid():
+                    self.add_error(result, line, key, col.code, form.errors)
+                    continue
+                changes.append((cell, form.get_cell_data()))
+                result['changes'].append({
+                    'line': line,
+                    'key': key,
+                    'code': col.code,
+                    'old': TableExport.clean(col.plugin.get_export_value(cell)),
+                    'new': item.get(col.code, ''),
+                })
+        result['rows'] += len(items)
+        if changes and not self.dry_run and not result['errors']:
+            table.save_many(changes)
+
+    @staticmethod
+    def get_compare_fields(col):
+        """ :returns: Dict of the form fields of the col without values """
+        fields = col.descriptor.field_factory(None)
+        if isinstance(fields, dict):
+            return fields
+        return {col.code: fields}
+
+    def add_error(self, result, line, key, code, errors):
+        result['errors'].append({
+            'line': line,
+            'key': key,
+            'code': code,
+            'errors': errors,
+        })
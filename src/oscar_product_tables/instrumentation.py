@@ -0,0 +1,120 @@
+import logging
+from contextlib import ExitStack, contextmanager, nullcontext
+from time import perf_counter
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.functional import cached_property
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+__all__ = ['Timings', 'Instrumentation', 'instrumentation', 'log_timings']
+
+
+class NullTimings:
+    """ Timings when instrumentation is off, every phase is a no-op """
+    enabled = False
+    phases = {}
+    null_phase = nullcontext()
+
+    def phase(self, name):
+        return self.null_phase
+
+
+null_timings = NullTimings()
+
+
+class Timings:
+    """
+    Wall time and number of queries per phase, e.g. 'attribute-objects',
+    'attribute-fill' or 'render'. Phases with the same name add up, nested
+    phases are included in the outer ones.
+
+    :param aliases: Databases whose queries are counted
+    """
+    enabled = True
+
+    def __init__(self, aliases=(DEFAULT_DB_ALIAS,)):
+        self.aliases = aliases
+        self.phases = {}
+        self.queries = 0
+        self.depth = 0
+
+    def count_query(self, execute, sql, params, many, context):
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+    @contextmanager
+    def phase(self, name):
+        start, queries = perf_counter(), self.queries
+        self.depth += 1
+        try:
+            if self.depth == 1:
+                with ExitStack() as stack:
+                    for alias in self.aliases:
+                        stack.enter_context(connections[alias].execute_wrapper(
+                            self.count_query))
+                    yield
+            else:
+                yield
+        finally:
+            self.depth -= 1
+            phase = self.phases.setdefault(name, {'seconds': 0, 'queries': 0})
+            phase['seconds'] += perf_counter() - start
+            phase['queries'] += self.queries - queries
+
+    def header(self):
+        """ :returns: Value of a Server-Timing header """
+        return ', '.join(
+            f'{name};dur={phase["seconds"] * 1000:.1f};'
+            f'desc="{phase["queries"]} queries"'
+            for name, phase in self.phases.items())
+
+    def __str__(self):
+        return ', '.join(
+            f'{name} {phase["seconds"] * 1000:.1f}ms {phase["queries"]}q'
+            for name, phase in self.phases.items())
+
+
+def log_timings(timings, request=None):
+    """ Default callback, logs the timings of the request """
+    logger.info('%s: %s', getattr(request, 'path', None), timings)
+
+
+class Instrumentation:
+    """
+    Hands out Timings per request and reports them to the callback, a
+    function of (timings, request) like log_timings
+    """
+    def __init__(self, enabled=False, server_timing=False, callback=None):
+        self.enabled = enabled
+        self.server_timing = server_timing
+        self.callback_path = callback
+
+    @cached_property
+    def callback(self):
+        if isinstance(self.callback_path, str):
+            return import_string(self.callback_path)
+        return self.callback_path or log_timings
+
+    def start(self, aliases=(DEFAULT_DB_ALIAS,)):
+        """ :param aliases: Databases whose queries are counted """
+        return Timings(aliases) if self.enabled else null_timings
+
+    def report(self, timings, request=None):
+        if timings.enabled:
+            self.callback(timings, request)
+
+    def report_after(self, timings, content, request=None):
+        """ Streamed content is timed and reported once it is consumed """
+        with timings.phase('stream'):
+            yield from content
+        self.report(timings, request)
+
+
+instrumentation = Instrumentation(
+    enabled=getattr(settings, 'PRODUCT_TABLES_INSTRUMENTATION', False),
+    server_timing=getattr(settings, 'PRODUCT_TABLES_SERVER_TIMING', False),
+    callback=getattr(settings, 'PRODUCT_TABLES_INSTRUMENTATION_CALLBACK',
+                     None),
+)
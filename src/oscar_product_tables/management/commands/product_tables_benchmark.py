@@ -0,0 +1,80 @@
+from django.core.management.base import BaseCommand, CommandError
+from oscar.core.loading import get_model
+from ...benchmarks import (
+    compare_chunk_sizes, compare_layouts, compare_pruning,
+    compare_query_counts, compare_query_plans, compare_renderers,
+    export_throughput, page_latencies)
+from ..legacy import build_per_cell
+
+Product = get_model('catalogue', 'Product')
+Category = get_model('catalogue', 'Category')
+
+
+class Command(BaseCommand):
+    help = ('Compares memory and time of the table layouts and checks that '
+            'rendering does not run queries per cell')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--category', help='Slug of the category')
+        parser.add_argument('--limit', type=int, default=None)
+        parser.add_argument('--per-page', type=int, default=100)
+
+    def handle(self, *args, category=None, limit=None, per_page=100,
+               **options):
+        qs = Product.objects.browsable_dashboard().order_by('title')
+        if category:
+            categories = Category.objects.get(
+                slug=category).get_descendants_and_self()
+            qs = qs.filter(categories__in=categories).distinct()
+        if limit:
+            qs = qs[:limit]
+        results = compare_layouts(qs, {'per_cell': build_per_cell})
+        for name, result in results.items():
+            self.stdout.write('{}: {:.3f}s, retained {:.1f} KiB, '
+                              'peak {:.1f} KiB'.format(
+                                  name, result['seconds'],
+                                  result['retained_memory'] / 1024,
+                                  result['peak_memory'] / 1024))
+
+        query_counts = compare_query_counts(qs)
+        for size, count in query_counts.items():
+            self.stdout.write(f'{size} rows: {count} queries')
+        if len(set(query_counts.values())) > 1:
+            raise CommandError('Query count depends on the number of rows')
+
+        for name, result in compare_pruning(qs).items():
+            self.stdout.write('{} cols: {} cols, {:.1f} KiB html, '
+                              '{:.3f}s'.format(name, result['cols'],
+                                               result['bytes'] / 1024,
+                                               result['seconds']))
+
+        for name, result in compare_query_plans(qs).items():
+            self.stdout.write('{}: {:.3f}s, {} queries, {} product '
+                              'columns'.format(name, result['seconds'],
+                                               result['queries'],
+                                               result['columns']))
+
+        result = compare_renderers(qs)
+        self.stdout.write('rows: template {:.3f}s, python {:.3f}s'.format(
+            result['template'], result['python']))
+        if not result['identical']:
+            raise CommandError('The renderers differ')
+
+        for chunk_size, result in compare_chunk_sizes(qs).items():
+            name = ('one table' if chunk_size == 'all'
+                    else f'chunks of {chunk_size}')
+            self.stdout.write('{}: {:.3f}s, peak {:.1f} KiB'.format(
+                name, result['seconds'], result['peak_memory'] / 1024))
+
+        result = export_throughput(qs)
+        self.stdout.write('csv export: {} rows, {:.0f} rows/s, '
+                          'peak {:.1f} KiB'.format(
+                              result['rows'], result['rows_per_second'],
+                              result['peak_memory'] / 1024))
+
+        if not limit:
+            latencies = page_latencies(qs, per_page)
+            self.stdout.write('{} pages: first {:.3f}s, last {:.3f}s, '
+                              'slowest {:.3f}s'.format(
+                                  len(latencies), latencies[0],
+                                  latencies[-1], max(latencies)))
@@ -0,0 +1,93 @@
+import json
+import os
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from ...benchmarks import compare_baseline, get_scenarios, run_scenarios
+from ...fixtures import CatalogGenerator
+from ...row_cache import row_cache
+from ...schema_cache import schema_cache
+
+
+class Command(BaseCommand):
+    help = ('Generates a synthetic catalog in a test database and measures '
+            'time, queries and peak memory of the table scenarios against a '
+            'stored baseline')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=1000)
+        parser.add_argument('--product-classes', type=int, default=5)
+        parser.add_argument('--attributes', type=int, default=8,
+                            help='Attributes per product class')
+        parser.add_argument('--partners', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--baseline',
+                            default='product_tables_baseline.json')
+        parser.add_argument('--save-baseline', action='store_true',
+                            help='Store the results as the new baseline')
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help='Allowed growth of time and memory')
+
+    def handle(self, *args, repeat=5, baseline=None, save_baseline=False,
+               tolerance=0.25, **options):
+        catalog = {key: options[key] for key in (
+            'products', 'product_classes', 'attributes', 'partners', 'seed')}
+        results = self.run(catalog, repeat)
+        for name, result in results.items():
+            self.stdout.write('{}: {:.4f}s, {} queries, '
+                              'peak {:.1f} KiB'.format(
+                                  name, result['seconds'], result['queries'],
+                                  result['peak_memory'] / 1024))
+
+        if save_baseline:
+            with open(baseline, 'w') as file:
+                json.dump({'catalog': catalog, 'results': results}, file,
+                          indent=2)
+            self.stdout.write(f'Saved the baseline to {baseline}')
+            return
+        if not os.path.exists(baseline):
+            self.stdout.write('No baseline, store one with --save-baseline')
+            return
+        with open(baseline) as file:
+            stored = json.load(file)
+        if stored['catalog'] != catalog:
+            raise CommandError('The baseline was measured on another catalog: '
+                               f'{stored["catalog"]}')
+        regressions = compare_baseline(results, stored['results'], tolerance)
+        if regressions:
+            raise CommandError('Regressions:\n' + '\n'.join(regressions))
+        self.stdout.write(self.style.SUCCESS('No regressions'))
+
+    def run(self, catalog, repeat):
+        """
+        The catalog is generated in a test database in memory, so no data of
+        the project is touched. Other backends would replace the test
+        database of the project, they are refused.
+        """
+        test_name = connection.settings_dict['TEST']['NAME']
+        if connection.vendor != 'sqlite' or not \
+                connection.creation.is_in_memory_db(test_name or ':memory:'):
+            raise CommandError(
+                'The suite needs an SQLite default database with its test '
+                'database in memory, without a TEST NAME')
+        name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False)
+        # Cached schemas and rows belong to the other database
+        schema_cache.invalidate_all()
+        row_cache.invalidate_all()
+        try:
+            generator = CatalogGenerator(**catalog)
+            category = generator.generate()
+            user = get_user_model()(is_staff=True, is_superuser=True)
+            product = category.product_set.order_by('pk').first()
+            # Option attribute of the first product class
+            code = f'{generator.prefix}1'
+            options = [option.pk for option in generator.groups['option']]
+            return run_scenarios(
+                get_scenarios(category, user, product, code, options), repeat)
+        finally:
+            schema_cache.invalidate_all()
+            row_cache.invalidate_all()
+            connection.creation.destroy_test_db(name, verbosity=0)
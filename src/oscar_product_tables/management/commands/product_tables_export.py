@@ -0,0 +1,51 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+from oscar.core.loading import get_model
+from ...context import TableContext
+from ...export import TableExport
+from ...read_database import read_database
+
+Product = get_model('catalogue', 'Product')
+Category = get_model('catalogue', 'Category')
+
+
+class Command(BaseCommand):
+    help = 'Exports the product table as csv or xlsx'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--category', help='Slug of the category')
+        parser.add_argument('--format', choices=TableExport.formats,
+                            default='csv')
+        parser.add_argument('--output', help='File path, csv goes to stdout '
+                                             'without it')
+        parser.add_argument('--chunk-size', type=int, default=500)
+        parser.add_argument('--database', default=read_database.alias,
+                            help='Alias to read from, '
+                                 'PRODUCT_TABLES_READ_DATABASE by default')
+
+    def handle(self, *args, category=None, format='csv', output=None,
+               chunk_size=500, database=None, **options):
+        qs = Product.objects.browsable_dashboard()
+        if category:
+            categories = Category.objects.get(
+                slug=category).get_descendants_and_self()
+            qs = qs.filter(categories__in=categories).distinct()
+        export = TableExport(qs, chunk_size=chunk_size,
+                             context=TableContext(using=database))
+        try:
+            content = export.iter_format(format)
+        except ImproperlyConfigured as error:
+            raise CommandError(str(error))
+        if output is None:
+            if format != 'csv':
+                raise CommandError('--output is needed for ' + format)
+            for lines in content:
+                self.stdout.write(lines, ending='')
+            return
+        if format == 'csv':
+            file = open(output, 'w', encoding='utf-8', newline='')
+        else:
+            file = open(output, 'wb')
+        with file:
+            for block in content:
+                file.write(block)
@@ -0,0 +1,38 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+from ...context import TableContext
+from ...importer import TableImport
+
+
+class Command(BaseCommand):
+    help = ('Imports a csv or xlsx file laid out like the export and saves '
+            'the changed cells')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=TableImport.formats,
+                            default=None, help='Default from the file suffix')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report the changes')
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, path, *args, format=None, dry_run=False, chunk_size=500,
+               **options):
+        file_format = format or ('xlsx' if path.endswith('.xlsx') else 'csv')
+        importer = TableImport(chunk_size=chunk_size, dry_run=dry_run,
+                               context=TableContext())
+        try:
+            with open(path, 'rb') as file:
+                result = importer.run(file, file_format)
+        except (ImproperlyConfigured, ValueError) as error:
+            raise CommandError(str(error))
+        for change in result['changes']:
+            self.stdout.write('{line}: {key} {code}: {old} -> {new}'.format(
+                **change))
+        for error in result['errors']:
+            self.stderr.write('{line}: {key} {code}: {errors}'.format(**error))
+        self.stdout.write('{} rows, {} changes, {} errors{}'.format(
+            result['rows'], len(result['changes']), len(result['errors']),
+            ', nothing saved' if dry_run or result['errors'] else ''))
+        if result['errors']:
+            raise CommandError('Import failed')
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+from ...snapshots import snapshot_store
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the product table snapshots of all products'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, chunk_size=500, **options):
+        if not snapshot_store.enabled:
+            raise CommandError('Set PRODUCT_TABLES_SNAPSHOTS = True first')
+        total = 0
+        for count in snapshot_store.rebuild(chunk_size=chunk_size):
+            total += count
+            self.stdout.write(f'{total} products')
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {total} snapshots'))
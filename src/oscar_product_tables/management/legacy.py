@@ -0,0 +1,160 @@
+"""
+The former per cell layout of the table, which the benchmark command
+compares the memory of the columnar layout with
+"""
+from django.conf import settings
+from django.contrib.sites.models import Site
+from django.db.models import Min
+from django.utils.functional import cached_property
+from oscar.core.loading import get_model
+from ..benchmarks import read_cells
+from ..col import Col
+from ..plugins import AttachedFieldsPlugin
+
+Product = get_model('catalogue', 'Product')
+ProductAttribute = get_model('catalogue', 'ProductAttribute')
+Partner = get_model('partner', 'Partner')
+
+__all__ = ['LegacyTable', 'build_per_cell']
+
+
+class LegacyCell:
+    """
+    Cell of the former per cell layout, one object with a __dict__ per
+    (row, col) that references its row, col and product
+    """
+    enabled = True
+
+    def __init__(self, row, col, obj=None, read_only=False):
+        self.read_only = read_only
+        self.row = row
+        self.col = col
+        self.name = col.name
+        self.code = col.code
+        self.product = row.product
+
+
+class LegacyAttachedCell(LegacyCell):
+    @property
+    def data(self):
+        field = Product._meta.get_field(self.code)
+        value = getattr(self.product, self.code)
+        if field.choices:
+            value = dict(field.choices).get(value, value)
+        return value
+
+
+class LegacyAttributeCell(LegacyCell):
+    """ Caches the values of its product once its data is read """
+    def __init__(self, obj, *args, **kwargs):
+        self.attribute = obj
+        super().__init__(*args, **kwargs)
+
+    @property
+    def enabled(self):
+        return self.code in [attribute.code for attribute in
+                             self.product.product_class.attributes.all()]
+
+    @property
+    def data(self):
+        value = self.attribute_values.get(self.code, None)
+        if value:
+            if self.attribute.type == 'option':
+                value = value.option
+            elif self.attribute.type == 'multi_option':
+                value = ', '.join([x.option for x in value])
+        return value
+
+    @cached_property
+    def attribute_values(self):
+        return {attribute_value.attribute.code: attribute_value.value
+                for attribute_value in self.product.attribute_values.all()}
+
+
+class LegacyPartnerCell(LegacyCell):
+    """ Caches the stockrecords of its product once its data is read """
+    def __init__(self, obj, *args, **kwargs):
+        self.partner = obj
+        super().__init__(*args, **kwargs)
+
+    @property
+    def show_sku(self):
+        site = Site.objects.get_current()
+        if getattr(site, 'configuration', None):
+            return getattr(site.configuration, 'own_upc', False)
+        return getattr(settings, 'DATATABLES_SHOW_SKU', False)
+
+    @property
+    def data(self):
+        if self.stockrecord:
+            if self.show_sku:
+                return (f'{self.stockrecord.partner_sku} > '
+                        f'{self.stockrecord.price}€')
+            return f'{self.stockrecord.price}€'
+        return '-'
+
+    @property
+    def stockrecord(self):
+        return self.stockrecords.get(self.partner.pk, None)
+
+    @cached_property
+    def stockrecords(self):
+        return {stockrecord.partner.pk: stockrecord
+                for stockrecord in self.product.stockrecords.all()}
+
+
+class LegacyRow:
+    def __init__(self, product):
+        self.product = product
+        self.cells = []
+
+
+class LegacyTable:
+    """
+    The object graph of the former layout: full products with all their
+    attribute values and stockrecords prefetched as model instances, one
+    row and one cell object per product and col. Multi option values are
+    not prefetched, like before.
+    """
+    def __init__(self, queryset):
+        fieldnames = AttachedFieldsPlugin.get_fieldnames()
+        self.products = queryset.select_related('product_class', *[
+            field for field in fieldnames
+            if Product._meta.get_field(field).is_relation
+        ]).prefetch_related(
+            'product_class__attributes',
+            'attribute_values',
+            'attribute_values__attribute',
+            'attribute_values__value_option',
+            'stockrecords',
+            'stockrecords__partner',
+        )
+        self.rows = [LegacyRow(product) for product in self.products]
+        self.cols = []
+        self.add_cells(LegacyAttachedCell, [
+            (Col(field.name, AttachedFieldsPlugin.get_field_label(field)), None)
+            for field in map(Product._meta.get_field, fieldnames)])
+        self.add_cells(LegacyAttributeCell, [
+            (Col(obj.code, obj.name), obj) for obj in self.get_attributes()])
+        self.add_cells(LegacyPartnerCell, [
+            (Col(obj.code, obj.name), obj) for obj in Partner.objects.all()])
+
+    @staticmethod
+    def get_attributes():
+        """ The first attribute of every code, on any database backend """
+        first = ProductAttribute.objects.order_by().values('code').annotate(
+            first=Min('pk')).values('first')
+        return ProductAttribute.objects.filter(pk__in=first).order_by(
+            'code').select_related('option_group')
+
+    def add_cells(self, cell_class, cols):
+        """ :param cols: List of (col, object of the cells) """
+        for row in self.rows:
+            for col, obj in cols:
+                row.cells.append(cell_class(row=row, col=col, obj=obj))
+        self.cols.extend(col for col, obj in cols)
+
+
+def build_per_cell(queryset, **table_kwargs):
+    """ The former layout, see LegacyTable """
+    return read_cells(LegacyTable(queryset))
@@ -0,0 +1,28 @@
+# Generated by Django 3.2.25 on 2026-10-18 10:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('catalogue', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductTableSnapshot',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='table_snapshot', serialize=False, to='catalogue.product', verbose_name='Product')),
+                ('values', models.TextField(default='{}', verbose_name='Values')),
+                ('date_updated', models.DateTimeField(auto_now=True, verbose_name='Date updated')),
+            ],
+            options={
+                'verbose_name': 'Product table snapshot',
+                'verbose_name_plural': 'Product table snapshots',
+            },
+        ),
+    ]
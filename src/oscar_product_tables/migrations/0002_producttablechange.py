@@ -0,0 +1,24 @@
+# Generated by Django 3.2.25 on 2026-10-18 10:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('oscar_product_tables', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductTableChange',
+            fields=[
+                ('product_id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='Product')),
+                ('date_changed', models.DateTimeField(db_index=True, verbose_name='Date changed')),
+            ],
+            options={
+                'verbose_name': 'Product table change',
+                'verbose_name_plural': 'Product table changes',
+            },
+        ),
+    ]
@@ -0,0 +1,55 @@
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+
+
+class ProductTableSnapshot(models.Model):
+    """
+    Flat copy of the attribute values and stockrecords of one product, so
+    the table reads them together with the product. The values are stored as
+    Json text, which works on every database and django version.
+    """
+    product = models.OneToOneField(
+        'catalogue.Product',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='table_snapshot',
+        verbose_name=_('Product'),
+    )
+    values = models.TextField(_('Values'), default='{}')
+    date_updated = models.DateTimeField(_('Date updated'), auto_now=True)
+
+    class Meta:
+        verbose_name = _('Product table snapshot')
+        verbose_name_plural = _('Product table snapshots')
+
+    @cached_property
+    def data(self):
+        """ :returns: Dict of {plugin code: values of the plugin} """
+        return json.loads(self.values)
+
+    def set_data(self, data):
+        self.values = json.dumps(data, cls=DjangoJSONEncoder)
+        self.__dict__.pop('data', None)
+
+    def __str__(self):
+        return str(self.product_id)
+
+
+class ProductTableChange(models.Model):
+    """
+    When the table data of a product last changed, also for changes that do
+    not touch the product's date_updated like attribute values. Deleted
+    products keep their entry, so clients can remove their rows.
+    """
+    product_id = models.BigIntegerField(_('Product'), primary_key=True)
+    date_changed = models.DateTimeField(_('Date changed'), db_index=True)
+
+    class Meta:
+        verbose_name = _('Product table change')
+        verbose_name_plural = _('Product table changes')
+
+    def __str__(self):
+        return str(self.product_id)
@@ -0,0 +1,86 @@
+from django.conf import settings
+from oscar.core.loading import get_model
+from .cache import VersionedCache
+
+AttributeOption = get_model('catalogue', 'AttributeOption')
+
+__all__ = ['OptionIndex', 'option_index']
+
+
+class OptionIndex(VersionedCache):
+    """
+    The options of every option group as (pk, option, folded option), so
+    searching and counting them needs no query. Every change to an option
+    bumps the version.
+    """
+    version_key = 'product_tables:options:version'
+
+    def __init__(self, alias=None, timeout=None, page_size=50,
+                 remote_from=None):
+        super().__init__(alias, timeout)
+        self.page_size = page_size
+        self.remote_from = remote_from
+
+    def get(self, group_id):
+        """ :returns: List of (pk, option, folded option) ordered by pk """
+        if not self.enabled:
+            return self.load(group_id)
+        key = f'product_tables:options:{self.get_version()}:{group_id}'
+        return self.cache.get_or_set(
+            key, lambda: self.load(group_id), self.timeout)
+
+    @staticmethod
+    def load(group_id):
+        qs = AttributeOption.objects.filter(group_id=group_id).order_by('pk')
+        return [(pk, option, option.casefold())
+                for pk, option in qs.values_list('pk', 'option')]
+
+    def get_ids(self, group_id):
+        """ :returns: Dict of {option: pk} """
+        return {option: pk for pk, option, folded in self.get(group_id)}
+
+    def is_remote(self, group_id):
+        """ Groups with remote_from options or more are searched remotely """
+        if self.remote_from is None or group_id is None:
+            return False
+        return self.count(group_id) >= self.remote_from
+
+    def count(self, group_id):
+        """ Number of options of the group, without loading them """
+        if not self.enabled:
+            return self.load_count(group_id)
+        key = f'product_tables:options:{self.get_version()}:{group_id}:count'
+        return self.cache.get_or_set(
+            key, lambda: self.load_count(group_id), self.timeout)
+
+    @staticmethod
+    def load_count(group_id):
+        return AttributeOption.objects.filter(group_id=group_id).count()
+
+    def search(self, group_id, term='', page=1):
+        """
+        Options that contain the term, case insensitive
+
+        :returns: Tuple of [(pk, option), ...] of the page and whether more
+            pages follow
+        """
+        start = (max(page, 1) - 1) * self.page_size
+        end = start + self.page_size
+        if not self.enabled:
+            # Without the index only the page is loaded
+            qs = AttributeOption.objects.filter(
+                group_id=group_id, option__icontains=term).order_by('pk')
+            matches = list(qs.values_list('pk', 'option')[start:end + 1])
+            return matches[:self.page_size], len(matches) > self.page_size
+        term = term.casefold()
+        matches = [(pk, option) for pk, option, folded in self.get(group_id)
+                   if term in folded]
+        return matches[start:end], end < len(matches)
+
+
+option_index = OptionIndex(
+    alias=getattr(settings, 'PRODUCT_TABLES_OPTION_INDEX', None),
+    timeout=getattr(settings, 'PRODUCT_TABLES_OPTION_INDEX_TIMEOUT', 300),
+    page_size=getattr(settings, 'PRODUCT_TABLES_OPTION_PAGE_SIZE', 50),
+    remote_from=getattr(settings, 'PRODUCT_TABLES_REMOTE_OPTIONS', 100),
+)
@@ -0,0 +1,130 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from math import ceil
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from .count_cache import count_cache
+
+__all__ = ['KeysetPaginator', 'KeysetPage']
+
+
+class KeysetPage:
+    """ Has the parts of django's Page that the table templates use """
+    def __init__(self, paginator, object_list, number, next_cursor, pks=()):
+        self.paginator = paginator
+        self.object_list = object_list
+        self.pks = pks
+        self.number = number
+        self.next_cursor = next_cursor
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def next_page_number(self):
+        return self.number + 1
+
+    @property
+    def progress(self):
+        """ Estimated progress in percent, never 100 before the last page """
+        if not self.has_next():
+            return 100
+        return min(99, int(self.number / self.paginator.num_pages * 100))
+
+    def __repr__(self):
+        return '<Page {}>'.format(self.number)
+
+
+class KeysetPaginator:
+    """
+    Paginates by a cursor on (title, pk) instead of COUNT and OFFSET, so every
+    page costs the same no matter how deep it is. The total is only an
+    estimate that can be cached across requests.
+
+    :param cache_key: Name of the count in the count cache
+    """
+    ordering = ('title', 'pk')
+
+    def __init__(self, queryset, per_page, cache_key=None):
+        self.queryset = queryset.order_by(*self.ordering)
+        self.per_page = per_page
+        self.cache_key = cache_key
+
+    @property
+    def count(self):
+        if self.cache_key is None:
+            return self.queryset.count()
+        return count_cache.get_or_set(self.cache_key, self.queryset.count)
+
+    @property
+    def num_pages(self):
+        return max(1, ceil(self.count / self.per_page))
+
+    def page(self, number=1, cursor=None):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise InvalidPage('Page number is not an integer')
+        if number < 1:
+            raise InvalidPage('Page number is less than 1')
+        qs = self.queryset
+        start = None
+        if cursor:
+            start = self.decode_cursor(cursor)
+        elif number > 1:
+            start = self.get_start_key(number)
+        if start is not None:
+            title, pk = start
+            qs = qs.filter(Q(title__gt=title) | Q(title=title, pk__gt=pk))
+        keys = list(qs.values_list(*self.ordering)[:self.per_page + 1])
+        next_cursor = None
+        if len(keys) > self.per_page:
+            keys = keys[:self.per_page]
+            next_cursor = self.encode_cursor(*keys[-1])
+        pks = [pk for title, pk in keys]
+        object_list = self.queryset.model.objects.filter(
+            pk__in=pks).order_by(*self.ordering)
+        return KeysetPage(self, object_list, number, next_cursor, pks)
+
+    def get_start_key(self, number):
+        """
+        The key a page without cursor starts after, e.g. of an old link, is
+        found with one OFFSET query
+
+        :returns: Tuple of (title, pk)
+        """
+        offset = (number - 1) * self.per_page - 1
+        keys = list(self.queryset.values_list(*self.ordering)[
+            offset:offset + 1])
+        if not keys:
+            raise InvalidPage('Page contains no results')
+        return keys[0]
+
+    def get_cursors(self):
+        """
+        Walks the keys once and returns the cursor every page starts after, so
+        the pages can be requested independently. The first page has None.
+        The exact count is cached for the estimate on the way.
+        """
+        cursors = [None]
+        count = 0
+        for key in self.queryset.values_list(*self.ordering).iterator():
+            count += 1
+            if count % self.per_page == 0:
+                cursors.append(self.encode_cursor(*key))
+        if count and count % self.per_page == 0:
+            cursors.pop()
+        if self.cache_key is not None:
+            count_cache.set(self.cache_key, count)
+        return cursors
+
+    @staticmethod
+    def encode_cursor(title, pk):
+        return urlsafe_b64encode(json.dumps([title, pk]).encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor):
+        try:
+            title, pk = json.loads(urlsafe_b64decode(cursor.encode()))
+            return title, int(pk)
+        except (TypeError, ValueError):
+            raise InvalidPage('Invalid cursor')
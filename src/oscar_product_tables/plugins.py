@@ -1,11 +1,31 @@
+from datetime import datetime
+from functools import partial
+from operator import attrgetter, methodcaller
 from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.db.models import Count, F, Min, OuterRef, Q, Subquery
+from django.db.models.fields.files import FieldFile
+from django.db.models.functions import Floor
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
 from oscar.core.loading import get_model
-from .col import Col
+from oscar.apps.dashboard.catalogue.forms import ProductForm
+from .col import Col, ColDescriptor
 from .cell import *
+from .forms import remote_option_field
+from .instrumentation import null_timings
+from .option_index import option_index
+from .query_plan import QueryPlan
+from .read_database import read_database
+from .schema_cache import schema_cache
+from .snapshots import snapshot_store
 
 Product = get_model('catalogue', 'Product')
 ProductAttribute = get_model('catalogue', 'ProductAttribute')
+ProductAttributeValue = get_model('catalogue', 'ProductAttributeValue')
 Partner = get_model('partner','Partner')
+StockRecord = get_model('partner','StockRecord')
 
 __all__ = ['FieldsPluginBase', 'AttachedFieldsPlugin', 'AttributeFieldsPlugin',
            'PartnerFieldsPlugin']
@@ -16,54 +36,304 @@ class FieldsPluginBase:
     Col need to be classmethods because they are needed before instantiating
     """
     cell_class = None
+    schema_name = None
+    # Search terms of boolean cols, the table shows them as icons
+    boolean_values = {
+        'true': True, 'yes': True, '1': True,
+        'false': False, 'no': False, '0': False,
+    }
 
-    def __init__(self, rows, read_only=False):
+    def __init__(self, rows, read_only=False, context=None, codes=None,
+                 scope=None):
         self.read_only = read_only
+        self.context = context
+        self.codes = codes
+        self.scope = scope
         self.code = self.cell_class.type
-        self.objects = self.get_objects()
+        timings = self.timings
+        with timings.phase(f'{self.code}-objects'):
+            self.objects = self.get_objects()
         self.cols = [*self.get_cols()]
-        self.rows = self.add_cells_to_rows(rows)
+        for col in self.cols:
+            col.plugin = self
+            col.descriptor = self.get_descriptor(col)
+        with timings.phase(f'{self.code}-fill'):
+            self.rows = self.fill_cols(rows) if self.cols else rows
+
+    @property
+    def timings(self):
+        return getattr(self.context, 'timings', null_timings)
+
+    @property
+    def using(self):
+        """ Database alias of the table or None to route as usual """
+        return getattr(self.context, 'using', None)
+
+    def route(self, qs, shared=False):
+        """
+        Sends the queryset to the database of the table. Shared reads end up
+        in a cache for all requests and go to the primary, which has every
+        write.
+        """
+        using = read_database.primary if shared and self.using else self.using
+        return qs if using is None else qs.using(using)
 
     def get_objects(self):
         '''
+        Objects with a schema_name are shared across requests by the schema
+        cache and limited to the codes afterwards
+
         :returns: Dict of all objects with an identifier as key
         '''
-        return {obj.code: obj for obj in self.get_queryset()}
+        if self.schema_name is None or not schema_cache.enabled:
+            return self.load_objects(
+                self.route(self.filter_codes(self.get_queryset())))
+        objects = schema_cache.get_or_set(
+            self.schema_name, lambda: self.load_objects(
+                self.route(self.get_queryset(), shared=True)))
+        if self.codes is None:
+            return objects
+        return {code: obj for code, obj in objects.items()
+                if code in self.codes}
+
+    @staticmethod
+    def load_objects(qs):
+        return {obj.code: obj for obj in qs}
+
+    def get_descriptor(self, col):
+        """ :returns: ColDescriptor, compiled once per col and table """
+        raise NotImplementedError('Needs to be overwritten')
 
-    def add_cells_to_rows(self, rows):
+    def fill_cols(self, rows):
+        """ Fills the value column and the enabled mask of every col """
         for row in rows:
-            for col in self.cols:
-                obj = self.get_obj(row, col)
-                cell = self.cell_class(
-                    row=row, col=col, obj=obj, read_only=self.read_only)
-                row.add_cell(cell)
+            self.add_row(row)
         return rows
 
+    def add_row(self, row):
+        source = self.get_source(row.product)
+        for col in self.cols:
+            col.append(col.descriptor.accessor(source))
+
+    def get_source(self, product):
+        """ The object that the accessors of the descriptors read from """
+        return product
+
+    def get_cell(self, row, col):
+        return self.cell_class(row=row, col=col, read_only=self.read_only)
+
     def get_cols(self):
         raise NotImplementedError('Needs to be overwritten')
 
+    def save_many(self, changes):
+        """
+        Saves the cleaned data of many cells of this plugin, overwrite to
+        write them in bulk
+
+        :param changes: List of (cell, data)
+        """
+        for cell, data in changes:
+            cell.save(**data)
+
+    def get_export_value(self, cell):
+        """ :returns: Value of the cell in exports """
+        return self.get_export_scalar(cell.data)
+
+    @staticmethod
+    def get_export_scalar(value):
+        """
+        Values that csv and xlsx can hold: related objects by their pk, like
+        the import reads them, files by name and datetimes in local time
+        without timezone
+        """
+        if isinstance(value, models.Model):
+            return value.pk
+        if isinstance(value, FieldFile):
+            return value.name
+        if isinstance(value, datetime) and timezone.is_aware(value):
+            return timezone.make_naive(value)
+        return value
+
+    def get_import_data(self, col, value):
+        """ :returns: Form data of an imported value, reverses the export """
+        return {col.code: value}
+
+    def get_initial(self, cell):
+        """ :returns: Dict of the initial values of the cell's form fields """
+        return {cell.code: cell.value}
+
+    def get_search_q(self, col, value):
+        """ :returns: Q object on Product matching the search value or None """
+        return None
+
+    def get_order_by(self, col):
+        """ :returns: Expression to order products by this col or None """
+        return None
+
+    def get_facets(self, col, queryset):
+        """
+        Counts the products of the queryset per value of the col with one
+        GROUP BY query
+
+        :returns: List of {'value', 'label', 'count'} or None
+        """
+        return None
+
+    @staticmethod
+    def facet(value, label, count):
+        return {'value': value, 'label': label, 'count': count}
+
+    @classmethod
+    def to_python(cls, model_field, value):
+        """ :returns: The search value cleaned by the field or None """
+        if isinstance(model_field, models.BooleanField):
+            return cls.boolean_values.get(str(value).strip().lower(), None)
+        try:
+            return model_field.to_python(value)
+        except ValidationError:
+            return None
+
     def get_queryset(self):
         return []
 
-    def get_obj(self, row, col):
-        """ This fetches the relevant database object """
-        return self.objects.get(col.code, None)
+    def get_snapshot_data(self, product):
+        """ :returns: The part of the product's snapshot or None """
+        if not snapshot_store.enabled:
+            return None
+        snapshot = getattr(product, 'table_snapshot', None)
+        if snapshot is None:
+            return None
+        return snapshot.data.get(self.code, None)
+
+    @classmethod
+    def get_snapshot(cls, products):
+        """
+        :returns: Dict of {product_id: Json serializable values}, the part
+            of the snapshots this plugin reads back
+        """
+        return {}
+
+    def filter_codes(self, qs):
+        """ Limits the objects to the codes the table was created for """
+        if self.codes is None:
+            return qs
+        return qs.filter(code__in=self.codes)
+
+    @classmethod
+    def get_query_plan(cls, codes=None):
+        """
+        The table loads the products with the merged plans of its plugins
+
+        :param codes: Codes of the visible cols, None for all
+        :returns: QueryPlan of the product fields and relations that the
+            plugin reads
+        """
+        return QueryPlan()
+
+    @staticmethod
+    def get_snapshot_plan():
+        """ Plugins that read snapshots join them to the products """
+        if snapshot_store.enabled:
+            return QueryPlan(select_related=['table_snapshot'])
+        return QueryPlan()
 
     @classmethod
     def product_queryset(cls, qs):
+        """ Changes the queryset of the products after the query plan """
         return qs
 
 
 class AttachedFieldsPlugin(FieldsPluginBase):
     cell_class = AttachedCell
 
+    def get_objects(self):
+        return {}
+
     def get_cols(self):
         cols = []
         for code in self.get_fieldnames():
+            if self.codes is not None and code not in self.codes:
+                continue
             field = Product._meta.get_field(code)
-            cols.append(Col(field.name, self.get_field_label(field)))
+            cols.append(Col(field.name, self.get_field_label(field), field))
         return cols
 
+    def get_descriptor(self, col):
+        choices = dict(col.obj.choices) if col.obj.choices else None
+        return ColDescriptor(
+            accessor=attrgetter(col.code),
+            formatter=partial(self.format_choice, choices) if choices else None,
+            field_factory=partial(self.get_field, col.obj),
+            choices=choices,
+        )
+
+    @staticmethod
+    def format_choice(choices, value):
+        return choices.get(value, value)
+
+    def get_import_data(self, col, value):
+        if col.descriptor.choices:
+            keys = {str(label): key
+                    for key, label in col.descriptor.choices.items()}
+            value = keys.get(str(value), value)
+        return {col.code: value}
+
+    def get_search_q(self, col, value):
+        field = col.obj
+        if col.descriptor.choices:
+            keys = [key for key, label in col.descriptor.choices.items()
+                    if value.lower() in str(label).lower()]
+            return Q(**{f'{col.code}__in': keys}) if keys else None
+        if field.is_relation:
+            return None
+        if isinstance(field, (models.CharField, models.TextField)):
+            return Q(**{f'{col.code}__icontains': value})
+        value = self.to_python(field, value)
+        if value is None:
+            return None
+        return Q(**{col.code: value})
+
+    def get_order_by(self, col):
+        return F(col.code)
+
+    def get_facets(self, col, queryset):
+        field = col.obj
+        if isinstance(field, models.TextField):
+            return None
+        qs = self.route(Product.objects.filter(
+            pk__in=queryset.order_by().values('pk')))
+        qs = qs.order_by(col.code).values(col.code).annotate(count=Count('pk'))
+        counts = [(item[col.code], item['count']) for item in qs]
+        labels = {}
+        if field.is_relation:
+            labels = self.route(field.related_model.objects.all()).in_bulk(
+                [value for value, count in counts if value is not None])
+        return [self.facet(
+            value, str(labels.get(value, col.descriptor.format(value))), count)
+            for value, count in counts]
+
+    def save_many(self, changes):
+        products = {}
+        fields = set()
+        for cell, data in changes:
+            for code, value in data.items():
+                if getattr(cell.product, code) != value:
+                    setattr(cell.product, code, value)
+                    products[cell.product.pk] = cell.product
+                    fields.add(code)
+        if products:
+            now = timezone.now()
+            for product in products.values():
+                product.date_updated = now
+            Product.objects.bulk_update(
+                products.values(), [*fields, 'date_updated'])
+
+    @staticmethod
+    def get_field(model_field, value):
+        field = model_field.formfield()
+        field.initial = value
+        return field
+
     @staticmethod
     def get_field_label(field):
         if field.related_model:
@@ -76,46 +346,560 @@ class AttachedFieldsPlugin(FieldsPluginBase):
         return ['upc', 'title', *fieldnames]
 
     @classmethod
-    def product_queryset(cls, qs):
-        for field in cls.get_fieldnames():
-            if Product._meta.get_field(field).is_relation:
-                qs = qs.select_related(field)
-        return qs
+    def get_query_plan(cls, codes=None):
+        fieldnames = [code for code in cls.get_fieldnames()
+                      if codes is None or code in codes]
+        return QueryPlan(only=fieldnames, select_related=[
+            field for field in fieldnames
+            if Product._meta.get_field(field).is_relation])
 
 
 class AttributeFieldsPlugin(FieldsPluginBase):
     cell_class = AttributeCell
+    schema_name = 'attributes'
+    value_fields = {
+        'text': 'value_text',
+        'richtext': 'value_richtext',
+        'integer': 'value_integer',
+        'boolean': 'value_boolean',
+        'float': 'value_float',
+        'date': 'value_date',
+        'datetime': 'value_datetime',
+        'option': 'value_option',
+        'multi_option': 'value_multi_option',
+        'file': 'value_file',
+        'image': 'value_image',
+    }
+
+    def __init__(self, *args, **kwargs):
+        self.options = {}
+        self.option_ids = {}
+        super().__init__(*args, **kwargs)
+
+    def get_objects(self):
+        objects = super().get_objects()
+        if self.scope is None:
+            return objects
+        codes = set(self.get_scope_codes())
+        return {code: obj for code, obj in objects.items() if code in codes}
+
+    def get_scope_codes(self):
+        """
+        :returns: Codes of the attributes of the product classes in the
+            scope, in one query
+        """
+        class_ids = self.route(self.scope).order_by().values('product_class_id')
+        qs = self.route(
+            ProductAttribute.objects.filter(product_class__in=class_ids))
+        return qs.order_by().values_list('code', flat=True).distinct()
 
     def get_cols(self):
         for obj in self.objects.values():
-            yield Col(obj.code, obj.name)
+            yield Col(obj.code, obj.name, obj)
 
-    def get_queryset(self):
-        qs = ProductAttribute.objects.distinct('code')
-        qs = qs.select_related('option_group')
-        qs = qs.prefetch_related('option_group__options')
-        return qs
+    def get_descriptor(self, col):
+        formatter = {
+            'option': self.format_option,
+            'multi_option': self.format_multi_option,
+        }.get(col.obj.type, None)
+        return ColDescriptor(
+            accessor=methodcaller('get', col.code, None),
+            formatter=formatter,
+            field_factory=partial(self.get_field, col.obj),
+        )
 
-    @classmethod
-    def product_queryset(cls, qs):
-        qs = qs.select_related('product_class')
-        qs = qs.prefetch_related(
-            'product_class__attributes',
-            'attribute_values',
-            'attribute_values__attribute',
-            'attribute_values__value_option',
-            'stockrecords',
-            'stockrecords__partner',
+    def get_search_q(self, col, value):
+        lookup = {
+            'text': 'value_text__icontains',
+            'richtext': 'value_richtext__icontains',
+            'option': 'value_option__option__icontains',
+            'multi_option': 'value_multi_option__option__icontains',
+        }.get(col.obj.type, None)
+        if lookup is None:
+            value_field = self.value_fields.get(col.obj.type, None)
+            if value_field is None:
+                return None
+            value = self.to_python(
+                ProductAttributeValue._meta.get_field(value_field), value)
+            if value is None:
+                return None
+            lookup = value_field
+        qs = ProductAttributeValue.objects.filter(
+            attribute__code=col.code, **{lookup: value})
+        return Q(pk__in=qs.values('product_id'))
+
+    def get_order_by(self, col):
+        value_field = {
+            'option': 'value_option__option',
+            'multi_option': 'value_multi_option__option',
+        }.get(col.obj.type, self.value_fields.get(col.obj.type, None))
+        if value_field is None:
+            return None
+        qs = ProductAttributeValue.objects.filter(
+            product=OuterRef('pk'), attribute__code=col.code)
+        return Subquery(qs.order_by(value_field).values(value_field)[:1])
+
+    def get_facets(self, col, queryset):
+        attribute = col.obj
+        if attribute.type in ('file', 'image', 'richtext'):
+            return None
+        value_field = self.value_fields[attribute.type]
+        fields = [value_field]
+        if attribute.type in ('option', 'multi_option'):
+            fields.append(f'{value_field}__option')
+        qs = self.route(ProductAttributeValue.objects.filter(
+            product__in=queryset.order_by().values('pk'),
+            attribute__code=attribute.code,
+            **{f'{value_field}__isnull': False},
+        )).order_by(*fields).values(*fields).annotate(
+            count=Count('product', distinct=True))
+        return [self.facet(item[value_field], str(item[fields[-1]]),
+                           item['count']) for item in qs]
+
+    def save_many(self, changes):
+        """
+        Deletes the emptied values and writes the others with one
+        bulk_update per value field and one bulk_create. File and image
+        values can not be saved here.
+        """
+        products = {cell.product.pk: cell.product for cell, data in changes}
+        attributes = self.get_product_attributes(
+            products.values(), {code for cell, data in changes for code in data})
+        existing = {
+            (value.product_id, value.attribute_id): value
+            for value in ProductAttributeValue.objects.filter(
+                product__in=products, attribute__in=attributes.values())
+        }
+        deleted, created, updated, multi_options = [], [], {}, {}
+        for cell, data in changes:
+            product = cell.product
+            for code, value in data.items():
+                attribute = attributes.get((product.product_class_id, code))
+                if attribute is None or attribute.type in ('file', 'image'):
+                    continue
+                value_field = self.value_fields.get(attribute.type, None)
+                if value_field is None:
+                    continue
+                key = (product.pk, attribute.pk)
+                current = existing.get(key, None)
+                if value is None or value == '' or (
+                        attribute.type == 'multi_option' and not value):
+                    if current is not None:
+                        deleted.append(current.pk)
+                    continue
+                if current is None:
+                    current = ProductAttributeValue(
+                        product=product, attribute=attribute)
+                    created.append(current)
+                elif attribute.type != 'multi_option':
+                    updated.setdefault(value_field, []).append(current)
+                if attribute.type == 'multi_option':
+                    multi_options[key] = value
+                else:
+                    setattr(current, value_field, value)
+
+        ProductAttributeValue.objects.filter(pk__in=deleted).delete()
+        for value_field, values in updated.items():
+            ProductAttributeValue.objects.bulk_update(values, [value_field])
+        ProductAttributeValue.objects.bulk_create(created)
+        if multi_options:
+            self.set_multi_options(multi_options)
+
+    @staticmethod
+    def set_multi_options(multi_options):
+        """ :param multi_options: Dict of {(product_id, attribute_id): options} """
+        through = ProductAttributeValue.value_multi_option.through
+        value_ids = {
+            (product_id, attribute_id): pk
+            for pk, product_id, attribute_id
+            in ProductAttributeValue.objects.filter(
+                product__in={product_id for product_id, _ in multi_options},
+                attribute__in={attribute_id for _, attribute_id in multi_options},
+            ).values_list('pk', 'product_id', 'attribute_id')
+        }
+        value_ids = {key: value_ids[key] for key in multi_options}
+        through.objects.filter(
+            productattributevalue__in=value_ids.values()).delete()
+        through.objects.bulk_create([
+            through(productattributevalue_id=value_ids[key],
+                    attributeoption_id=option.pk)
+            for key, options in multi_options.items() for option in options
+        ])
+
+    @staticmethod
+    def get_product_attributes(products, codes):
+        """ :returns: Dict of {(product_class_id, code): attribute} """
+        qs = ProductAttribute.objects.filter(
+            product_class__in={product.product_class_id for product in products},
+            code__in=codes,
         )
+        return {(attribute.product_class_id, attribute.code): attribute
+                for attribute in qs}
+
+    def get_import_data(self, col, value):
+        if col.obj.type in ('option', 'multi_option') and value:
+            option_ids = self.get_option_ids(col)
+            if col.obj.type == 'multi_option':
+                value = [option_ids.get(text.strip(), text.strip())
+                         for text in str(value).split(',')]
+            else:
+                value = option_ids.get(str(value), value)
+        return {col.code: value}
+
+    def get_option_ids(self, col):
+        """ :returns: Dict of {option text: option id} of the col """
+        if col.code not in self.option_ids:
+            self.option_ids[col.code] = option_index.get_ids(
+                col.obj.option_group_id)
+        return self.option_ids[col.code]
+
+    def format_option(self, value):
+        return self.options.get(value, value)
+
+    def format_multi_option(self, value):
+        return ', '.join([self.options[x] for x in value or []]) or None
+
+    @staticmethod
+    def get_field(attribute, value):
+        """ Big option groups are searched remotely, see option_index """
+        if attribute.type in ('option', 'multi_option') \
+                and option_index.is_remote(attribute.option_group_id):
+            field = remote_option_field(attribute)
+        else:
+            field = ProductForm.FIELD_FACTORIES[attribute.type](attribute)
+        field.initial = value
+        return field
+
+    def fill_cols(self, rows):
+        products = [row.product for row in rows]
+        self.attribute_values = self.get_attribute_values(products)
+        self.attribute_codes = self.get_attribute_codes(products)
+        return super().fill_cols(rows)
+
+    def add_row(self, row):
+        product = row.product
+        source = self.get_source(product)
+        attribute_codes = self.attribute_codes.get(
+            product.product_class_id, ())
+        for col in self.cols:
+            col.append(col.descriptor.accessor(source),
+                       col.code in attribute_codes)
+
+    def get_source(self, product):
+        return self.attribute_values.get(product.id, {})
+
+    def get_attribute_values(self, products):
+        """
+        Reads the values of the products with a snapshot and loads the others
+        in one query. The names of the options go to self.options.
+
+        :returns: Dict of {product_id: {attribute_code: value}}
+        """
+        attribute_values = {}
+        live = []
+        for product in products:
+            data = self.get_snapshot_data(product)
+            if data is None:
+                live.append(product)
+                continue
+            attribute_values[product.id] = self.decode_values(data['values'])
+            self.options.update(
+                (int(pk), option) for pk, option in data['options'].items())
+        if live:
+            qs = self.route(
+                ProductAttributeValue.objects.filter(product__in=live))
+            if self.codes is not None or self.scope is not None:
+                qs = qs.filter(
+                    attribute__code__in=[col.code for col in self.cols])
+            values, options = self.load_attribute_values(qs)
+            attribute_values.update(values)
+            for product_options in options.values():
+                self.options.update(product_options)
+        return attribute_values
+
+    def decode_values(self, values):
+        """ Json has no dates, they are parsed by their value fields """
+        for code, value in values.items():
+            attribute = self.objects.get(code, None)
+            if value is not None and attribute is not None \
+                    and attribute.type in ('date', 'datetime'):
+                values[code] = ProductAttributeValue._meta.get_field(
+                    self.value_fields[attribute.type]).to_python(value)
+        return values
+
+    @classmethod
+    def load_attribute_values(cls, qs):
+        """
+        Loads the attribute values of the queryset without instantiating
+        them. Options are stored by id.
+
+        :returns: Tuple of {product_id: {attribute_code: value}} and
+            {product_id: {option_id: option}}
+        """
+        qs = qs.values(
+            'product_id', 'attribute__code', 'attribute__type',
+            *cls.value_fields.values(),
+            'value_option__option', 'value_multi_option__option',
+        ).order_by('pk', 'value_multi_option')
+        attribute_values = {}
+        options = {}
+        for item in qs:
+            product_id = item['product_id']
+            product_values = attribute_values.setdefault(product_id, {})
+            code = item['attribute__code']
+            value_type = item['attribute__type']
+            value = item.get(cls.value_fields.get(value_type), None)
+            if value_type == 'option' and value is not None:
+                options.setdefault(product_id, {})[value] = \
+                    item['value_option__option']
+            elif value_type == 'multi_option':
+                selected = product_values.setdefault(code, [])
+                if value is not None:
+                    options.setdefault(product_id, {})[value] = \
+                        item['value_multi_option__option']
+                    selected.append(value)
+                continue
+            product_values[code] = value
+        return attribute_values, options
+
+    @classmethod
+    def get_snapshot(cls, products):
+        values, options = cls.load_attribute_values(
+            ProductAttributeValue.objects.filter(product__in=products))
+        return {product: {
+            'values': values.get(product, {}),
+            'options': options.get(product, {}),
+        } for product in products}
+
+    def get_attribute_codes(self, products):
+        """ :returns: Dict of {product_class_id: {attribute_code, ...}} """
+        if schema_cache.enabled:
+            return schema_cache.get_or_set(
+                'attribute_codes',
+                lambda: self.load_attribute_codes(
+                    self.route(ProductAttribute.objects.all(), shared=True)))
+        class_ids = {product.product_class_id for product in products}
+        return self.load_attribute_codes(self.route(
+            ProductAttribute.objects.filter(product_class__in=class_ids)))
+
+    @staticmethod
+    def load_attribute_codes(qs):
+        attribute_codes = {}
+        for class_id, code in qs.values_list('product_class_id', 'code'):
+            attribute_codes.setdefault(class_id, set()).add(code)
+        return attribute_codes
+
+    @classmethod
+    def get_query_plan(cls, codes=None):
+        """ The values are loaded per product class """
+        return QueryPlan(only=['product_class']).merge(cls.get_snapshot_plan())
+
+    def get_queryset(self):
+        """ The first attribute of every code, on any database backend """
+        first = ProductAttribute.objects.order_by().values('code').annotate(
+            first=Min('pk')).values('first')
+        qs = ProductAttribute.objects.filter(pk__in=first).order_by('code')
+        qs = qs.select_related('option_group')
         return qs
 
 
 class PartnerFieldsPlugin(FieldsPluginBase):
     cell_class = PartnerCell
+    schema_name = 'partners'
+    price_bucket = getattr(settings, 'PRODUCT_TABLES_PRICE_BUCKET', 10)
 
     def get_cols(self):
         for obj in self.objects.values():
-            yield Col(obj.code, obj.name)
+            yield Col(obj.code, obj.name, obj)
+
+    def get_descriptor(self, col):
+        return ColDescriptor(
+            accessor=methodcaller('get', col.obj.pk, None),
+            formatter=partial(self.format_stockrecord, self.show_sku),
+            field_factory=partial(self.get_fields, self.show_sku),
+        )
+
+    @property
+    def show_sku(self):
+        return self.context.show_sku if self.context else False
+
+    @staticmethod
+    def format_stockrecord(show_sku, stockrecord):
+        if stockrecord:
+            if show_sku:
+                return (f"{stockrecord['partner_sku']} > "
+                        f"{stockrecord['price']}€")
+            return f"{stockrecord['price']}€"
+        return '-'
+
+    def get_export_value(self, cell):
+        return cell.value['price'] if cell.value else None
+
+    def get_import_data(self, col, value):
+        if isinstance(value, str):
+            value = value.strip(' €')
+        return {'price': value}
+
+    def get_initial(self, cell):
+        if not cell.value:
+            return {}
+        return {'partner_sku': cell.value['partner_sku'],
+                'price': cell.value['price']}
+
+    def get_search_q(self, col, value):
+        q = Q()
+        price = self.to_python(
+            StockRecord._meta.get_field('price'), value.strip(' €'))
+        if price is not None:
+            q |= Q(price=price)
+        if self.show_sku:
+            q |= Q(partner_sku__icontains=value)
+        if not q:
+            return None
+        qs = StockRecord.objects.filter(q, partner=col.obj)
+        return Q(pk__in=qs.values('product_id'))
+
+    def get_order_by(self, col):
+        qs = StockRecord.objects.filter(product=OuterRef('pk'), partner=col.obj)
+        return Subquery(qs.values('price')[:1])
+
+    @staticmethod
+    def get_fields(show_sku, stockrecord):
+        fields = {}
+        if show_sku:
+            field = StockRecord._meta.get_field('partner_sku').formfield()
+            field.widget.attrs['placeholder'] = _('Art.Nr.')
+            field.required = False
+            if stockrecord:
+                field.initial = stockrecord['partner_sku']
+            fields['partner_sku'] = field
+
+        field = StockRecord._meta.get_field('price').formfield()
+        field.widget.attrs['placeholder'] = _('Preis')
+        field.required = False
+        if stockrecord:
+            field.initial = stockrecord['price']
+        fields['price'] = field
+        return fields
+
+    def get_facets(self, col, queryset):
+        """ Prices in buckets of PRODUCT_TABLES_PRICE_BUCKET """
+        size = self.price_bucket
+        qs = self.route(StockRecord.objects.filter(
+            product__in=queryset.order_by().values('pk'),
+            partner=col.obj,
+        )).annotate(bucket=Floor(F('price') / size)).order_by('bucket').values(
+            'bucket').annotate(count=Count('product', distinct=True))
+        facets = []
+        for item in qs:
+            if item['bucket'] is None:
+                facets.append(self.facet(None, '-', item['count']))
+                continue
+            low = int(item['bucket']) * size
+            facets.append(self.facet(
+                low, f'{low}€ - {low + size}€', item['count']))
+        return facets
+
+    def save_many(self, changes):
+        """
+        Deletes the stockrecords without price, updates the existing ones in
+        one bulk_update and creates the missing ones in one bulk_create
+        """
+        existing = {
+            (stockrecord.product_id, stockrecord.partner_id): stockrecord
+            for stockrecord in StockRecord.objects.filter(
+                product__in={cell.product.pk for cell, data in changes},
+                partner__in={cell.partner.pk for cell, data in changes},
+            )
+        }
+        deleted, created, updated = [], [], []
+        fields = {'date_updated'}
+        now = timezone.now()
+        for cell, data in changes:
+            current = existing.get((cell.product.pk, cell.partner.pk), None)
+            data = {**data}
+            if not data.get('partner_sku', None):
+                if current is None or 'partner_sku' in data:
+                    data['partner_sku'] = cell.product.upc
+                else:  # Without the SKU field the existing one is kept
+                    data.pop('partner_sku', None)
+            if data.get('price', None) is None:
+                if current is not None:
+                    deleted.append(current.pk)
+            elif current is None:
+                created.append(StockRecord(
+                    product=cell.product, partner=cell.partner, **data))
+            else:
+                for code, value in data.items():
+                    setattr(current, code, value)
+                current.date_updated = now
+                fields.update(data)
+                updated.append(current)
+        StockRecord.objects.filter(pk__in=deleted).delete()
+        StockRecord.objects.bulk_update(updated, fields)
+        StockRecord.objects.bulk_create(created)
+
+    def fill_cols(self, rows):
+        self.stockrecords = self.get_stockrecords(
+            [row.product for row in rows])
+        return super().fill_cols(rows)
+
+    def get_source(self, product):
+        return self.stockrecords.get(product.id, {})
+
+    def get_stockrecords(self, products):
+        """
+        Reads the stockrecords of the products with a snapshot and loads the
+        others in one query
+
+        :returns: Dict of {product_id: {partner_id: stockrecord}}
+        """
+        stockrecords = {}
+        live = []
+        price_field = StockRecord._meta.get_field('price')
+        for product in products:
+            data = self.get_snapshot_data(product)
+            if data is None:
+                live.append(product)
+                continue
+            stockrecords[product.id] = {int(partner_id): {
+                **stockrecord,
+                'price': price_field.to_python(stockrecord['price']),
+            } for partner_id, stockrecord in data.items()}
+        if live:
+            partners = None if self.codes is None else [
+                col.obj.pk for col in self.cols]
+            stockrecords.update(
+                self.load_stockrecords(live, partners, self.using))
+        return stockrecords
+
+    @classmethod
+    def get_snapshot(cls, products):
+        stockrecords = cls.load_stockrecords(products)
+        return {product: stockrecords.get(product, {}) for product in products}
+
+    @staticmethod
+    def load_stockrecords(products, partners=None, using=None):
+        """
+        Loads the stockrecords of all products in one query as dicts
+
+        :param partners: Ids of the partners to load, None for all
+        :param using: Database alias, None routes as usual
+        :returns: Dict of {product_id: {partner_id: stockrecord}}
+        """
+        qs = StockRecord.objects.db_manager(using).filter(product__in=products)
+        if partners is not None:
+            qs = qs.filter(partner__in=partners)
+        qs = qs.values('product_id', 'partner_id', 'partner_sku', 'price')
+        stockrecords = {}
+        for stockrecord in qs:
+            stockrecords.setdefault(stockrecord['product_id'], {})[
+                stockrecord['partner_id']] = stockrecord
+        return stockrecords
+
+    @classmethod
+    def get_query_plan(cls, codes=None):
+        return cls.get_snapshot_plan()
 
     def get_queryset(self):
         return Partner.objects.all()
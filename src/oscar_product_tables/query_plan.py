@@ -0,0 +1,65 @@
+from django.conf import settings
+
+__all__ = ['QueryPlan']
+
+
+class QueryPlan:
+    """
+    The product fields and relations a plugin reads for its cols. The table
+    merges the plans of its plugins and loads the products with one query
+    that fetches nothing else.
+
+    :param only: Fields of Product, None loads all of them
+    :param select_related: Relations joined to the products
+    :param prefetch_related: Lookups or Prefetch objects
+    """
+    # Read by the table itself, e.g. for the urls of the products
+    base_fields = ('id', 'upc', 'slug', 'structure', 'product_class',
+                   'parent', 'date_updated')
+    enabled = getattr(settings, 'PRODUCT_TABLES_ONLY_VISIBLE_FIELDS', True)
+
+    def __init__(self, only=(), select_related=(), prefetch_related=()):
+        self.only = None if only is None else {*only}
+        self.select_related = {*select_related}
+        self.prefetch_related = {}
+        for lookup in prefetch_related:
+            self.add_prefetch(lookup)
+
+    def add_prefetch(self, lookup):
+        """ Lookups are deduplicated by their path """
+        key = getattr(lookup, 'prefetch_to', lookup)
+        self.prefetch_related.setdefault(key, lookup)
+
+    def merge(self, other):
+        """ :returns: New plan that loads what both plans load """
+        plan = QueryPlan(
+            only=None if self.only is None or other.only is None
+            else self.only | other.only,
+            select_related=self.select_related | other.select_related,
+        )
+        for lookup in [*self.prefetch_related.values(),
+                       *other.prefetch_related.values()]:
+            plan.add_prefetch(lookup)
+        return plan
+
+    def get_only(self):
+        """ Joined relations can not be deferred, they are loaded as well """
+        if self.only is None or not self.enabled:
+            return None
+        return sorted({*self.base_fields, *self.only,
+                       *(path.split('__')[0] for path in self.select_related)})
+
+    def apply(self, qs):
+        if self.select_related:
+            qs = qs.select_related(*sorted(self.select_related))
+        if self.prefetch_related:
+            qs = qs.prefetch_related(*self.prefetch_related.values())
+        only = self.get_only()
+        if only is not None:
+            qs = qs.only(*only)
+        return qs
+
+    def __repr__(self):
+        return (f'QueryPlan(only={self.get_only()}, '
+                f'select_related={sorted(self.select_related)}, '
+                f'prefetch_related={sorted(self.prefetch_related)})')
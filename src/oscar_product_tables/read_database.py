@@ -0,0 +1,64 @@
+from time import time
+from django.conf import settings
+from django.db import router
+from oscar.core.loading import get_model
+
+Product = get_model('catalogue', 'Product')
+
+__all__ = ['ReadDatabase', 'read_database']
+
+
+class ReadDatabase:
+    """
+    Database alias the tables read from, e.g. a replica. Requests that write
+    read from the primary, and so does the user who wrote for pin_seconds
+    afterwards, so editors see their own changes while the replica lags.
+    """
+    session_key = 'product_tables:written'
+    safe_methods = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, alias=None, pin_seconds=5):
+        self.alias = alias
+        self.pin_seconds = pin_seconds
+
+    @property
+    def enabled(self):
+        return self.alias is not None
+
+    @property
+    def primary(self):
+        return router.db_for_write(Product)
+
+    def get_alias(self, request=None):
+        """
+        :returns: Alias to read from for the request, None without a read
+            database, so the queries are routed as usual
+        """
+        if not self.enabled:
+            return None
+        if request is None:
+            return self.alias
+        if request.method not in self.safe_methods:
+            return self.primary
+        if self.is_pinned(request):
+            return self.primary
+        return self.alias
+
+    def pin(self, request):
+        """ The user reads from the primary for pin_seconds """
+        session = getattr(request, 'session', None)
+        if self.enabled and session is not None:
+            session[self.session_key] = time()
+
+    def is_pinned(self, request):
+        session = getattr(request, 'session', None)
+        if session is None:
+            return False
+        written = session.get(self.session_key, None)
+        return written is not None and time() - written < self.pin_seconds
+
+
+read_database = ReadDatabase(
+    alias=getattr(settings, 'PRODUCT_TABLES_READ_DATABASE', None),
+    pin_seconds=getattr(settings, 'PRODUCT_TABLES_READ_AFTER_WRITE', 5),
+)
@@ -0,0 +1,127 @@
+from django.db.models import Q
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_save, pre_delete)
+from django.dispatch import receiver
+from oscar.core.loading import get_model
+from .change_log import change_log
+from .count_cache import count_cache
+from .facet_cache import facet_cache
+from .option_index import option_index
+from .row_cache import row_cache
+from .schema_cache import schema_cache
+from .snapshots import snapshot_store
+
+Product = get_model('catalogue', 'Product')
+ProductAttribute = get_model('catalogue', 'ProductAttribute')
+ProductAttributeValue = get_model('catalogue', 'ProductAttributeValue')
+AttributeOption = get_model('catalogue', 'AttributeOption')
+AttributeOptionGroup = get_model('catalogue', 'AttributeOptionGroup')
+ProductCategory = get_model('catalogue', 'ProductCategory')
+Partner = get_model('partner', 'Partner')
+StockRecord = get_model('partner', 'StockRecord')
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_product(sender, instance, **kwargs):
+    row_cache.invalidate(instance.pk)
+    facet_cache.invalidate_all()
+
+
+@receiver(post_delete, sender=Product)
+def log_deleted_product(sender, instance, **kwargs):
+    """ Saved products have a new date_updated, deleted ones need an entry """
+    count_cache.invalidate_all()
+    change_log.log_on_commit(instance.pk)
+
+
+@receiver(post_save, sender=ProductAttributeValue)
+@receiver(post_delete, sender=ProductAttributeValue)
+@receiver(post_save, sender=StockRecord)
+@receiver(post_delete, sender=StockRecord)
+def invalidate_product_values(sender, instance, **kwargs):
+    row_cache.invalidate(instance.product_id)
+    facet_cache.invalidate_all()
+    snapshot_store.refresh_on_commit(instance.product_id)
+    change_log.log_on_commit(instance.product_id)
+
+
+@receiver(m2m_changed, sender=ProductAttributeValue.value_multi_option.through)
+def invalidate_multi_option(sender, instance, action, reverse, pk_set,
+                            **kwargs):
+    if not action.startswith('post_'):
+        return
+    facet_cache.invalidate_all()
+    if reverse:
+        row_cache.invalidate_all()
+        if pk_set:
+            product_ids = ProductAttributeValue.objects.filter(
+                pk__in=pk_set).values_list('product_id', flat=True)
+            snapshot_store.refresh_on_commit(*product_ids)
+            change_log.log_on_commit(*product_ids)
+    else:
+        row_cache.invalidate(instance.product_id)
+        snapshot_store.refresh_on_commit(instance.product_id)
+        change_log.log_on_commit(instance.product_id)
+
+
+@receiver(post_save, sender=ProductCategory)
+@receiver(post_delete, sender=ProductCategory)
+def log_category(sender, instance, **kwargs):
+    """ Products that join or leave a category are added or removed """
+    count_cache.invalidate_all()
+    change_log.log_on_commit(instance.product_id)
+
+
+@receiver(m2m_changed, sender=Product.categories.through)
+def log_categories(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    count_cache.invalidate_all()
+    if not reverse:
+        change_log.log_on_commit(instance.pk)
+    elif pk_set:
+        change_log.log_on_commit(*pk_set)
+    else:  # Cleared categories
+        change_log.log_on_commit(*instance.product_set.values_list(
+            'pk', flat=True))
+
+
+@receiver(post_save, sender=ProductAttribute)
+@receiver(post_delete, sender=ProductAttribute)
+@receiver(post_save, sender=AttributeOption)
+@receiver(post_delete, sender=AttributeOption)
+@receiver(post_save, sender=AttributeOptionGroup)
+@receiver(post_delete, sender=AttributeOptionGroup)
+@receiver(post_save, sender=Partner)
+@receiver(post_delete, sender=Partner)
+def invalidate_schema(sender, **kwargs):
+    schema_cache.invalidate_all()
+    row_cache.invalidate_all()
+    facet_cache.invalidate_all()
+    if sender in (AttributeOption, AttributeOptionGroup):
+        option_index.invalidate_all()
+
+
+@receiver(post_save, sender=ProductAttribute)
+def delete_attribute_snapshots(sender, instance, created, **kwargs):
+    if not created:
+        snapshot_store.delete(product__product_class=instance.product_class_id)
+
+
+@receiver(post_save, sender=AttributeOption)
+@receiver(pre_delete, sender=AttributeOption)
+def delete_option_snapshots(sender, instance, **kwargs):
+    snapshot_store.delete(product__in=ProductAttributeValue.objects.filter(
+        Q(value_option=instance) | Q(value_multi_option=instance),
+    ).values('product_id'))
+
+
+@receiver(post_save, sender=AttributeOption)
+@receiver(pre_delete, sender=AttributeOption)
+def log_option(sender, instance, **kwargs):
+    """ The products show the renamed or deleted option """
+    if change_log.enabled:
+        change_log.log_on_commit(*ProductAttributeValue.objects.filter(
+            Q(value_option=instance) | Q(value_multi_option=instance),
+        ).values_list('product_id', flat=True).distinct())
@@ -0,0 +1,69 @@
+from django.urls import reverse
+from django.utils.html import conditional_escape
+from django.utils.safestring import mark_safe
+from .templatetags.display_datatype_filters import BOOLEAN, NONE
+
+__all__ = ['RowRenderer']
+
+DISPLAY = {**NONE, **BOOLEAN}
+
+
+class RowRenderer:
+    """
+    Renders rows to the same html as product_tables/row.html, byte for byte,
+    without the template engine. The cell data is shown like the display
+    filter does, ids and urls are escaped like autoescaping does.
+    """
+    url_name = 'dashboard:catalogue-product'
+    placeholder = 987654321
+    # The whitespace of the template tags in row.html is part of the markup
+    row_html = '\n<tr data-productid="{}">\n  {}\n</tr>\n'
+    upc_html = ('\n    \n      <th>\n        <a href="{}" target="__blank">'
+                '\n          {}\n        </a>\n      </th>\n    \n  ')
+    cell_html = '\n    \n      <td {}{}>\n        {}\n      </td>\n    \n  '
+    disabled_html = ('\n    \n      <td style="color:#eee;cursor:no-drop;">'
+                     'n/a</td>\n    \n  ')
+
+    def __init__(self, request=None):
+        user = getattr(request, 'user', None)
+        self.superuser = bool(getattr(user, 'is_superuser', False))
+        self.url_pattern = None
+        if self.superuser:
+            # Reversed once, the pk is put in per row
+            self.url_pattern = reverse(self.url_name, args=[self.placeholder])
+
+    def get_url(self, product):
+        if self.url_pattern is not None:
+            url = self.url_pattern.replace(str(self.placeholder),
+                                           str(product.id))
+        else:
+            url = product.get_absolute_url()
+        return conditional_escape(url)
+
+    @staticmethod
+    def display(value):
+        if value is None or isinstance(value, bool):
+            return DISPLAY[value]
+        return str(value)
+
+    def render_cell(self, row, col):
+        cell = col.plugin.get_cell(row, col)
+        if cell.code == 'upc':
+            return self.upc_html.format(
+                self.get_url(row.product), self.display(cell.data))
+        if not cell.enabled:
+            return self.disabled_html
+        return self.cell_html.format(
+            '  style="white-space:normal;"' if cell.code == 'title' else '',
+            ' class="read_only"' if cell.read_only
+            else ' onclick="getForm($(this));"',
+            self.display(cell.data))
+
+    def render(self, row):
+        """ :returns: Html of the row as it is rendered by row.html """
+        return mark_safe(self.row_html.format(
+            conditional_escape(row.product.id),
+            ''.join(self.render_cell(row, col) for col in row.table.cols)))
+
+    def render_rows(self, rows):
+        return [self.render(row) for row in rows]
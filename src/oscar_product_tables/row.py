@@ -1,13 +1,18 @@
 
 
 class Row:
-    """ this is a list of cells """
-    def __init__(self, product):
+    """ View on one product of the table, cells are created on access """
+    __slots__ = ('table', 'index', 'product')
+
+    def __init__(self, table, index, product):
+        self.table = table
+        self.index = index
         self.product = product
-        self.cells = []
 
-    def add_cell(self, cell):
-        self.cells.append(cell)
+    @property
+    def cells(self):
+        for col in self.table.cols:
+            yield col.plugin.get_cell(self, col)
 
     def __repr__(self):
         return 'Row:' + str(self)
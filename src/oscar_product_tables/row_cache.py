@@ -0,0 +1,56 @@
+from hashlib import md5
+from django.conf import settings
+from .cache import VersionedCache
+
+__all__ = ['RowCache', 'row_cache']
+
+
+class RowCache(VersionedCache):
+    """
+    Rendered table rows in django's cache framework
+
+    One cache entry per product holds the html of every variant of its row.
+    A variant is the column set, the read only plugins, the SKU display and
+    whether the upc links to the dashboard. Saving a product or its values
+    deletes its entry, schema changes bump the version of all entries.
+    """
+    version_key = 'product_tables:rows:version'
+
+    def get_key(self, version, pk):
+        return f'product_tables:rows:{version}:{pk}'
+
+    @staticmethod
+    def get_variant(table, user):
+        parts = [
+            [col.code for col in table.cols],
+            sorted(plugin.code for plugin in table.plugins if plugin.read_only),
+            table.context.show_sku,
+            user.is_superuser,
+        ]
+        return md5(repr(parts).encode()).hexdigest()
+
+    def get_many(self, pks):
+        """ :returns: Dict of {pk: {variant: html}} of the cached products """
+        version = self.get_version()
+        keys = {self.get_key(version, pk): pk for pk in pks}
+        return {keys[key]: variants for key, variants
+                in self.cache.get_many(list(keys)).items()}
+
+    def set_many(self, entries):
+        """ :param entries: Dict of {pk: {variant: html}} """
+        version = self.get_version()
+        self.cache.set_many({
+            self.get_key(version, pk): variants
+            for pk, variants in entries.items()
+        }, self.timeout)
+
+    def invalidate(self, *pks):
+        if self.enabled:
+            version = self.get_version()
+            self.cache.delete_many([self.get_key(version, pk) for pk in pks])
+
+
+row_cache = RowCache(
+    alias=getattr(settings, 'PRODUCT_TABLES_ROW_CACHE', None),
+    timeout=getattr(settings, 'PRODUCT_TABLES_ROW_CACHE_TIMEOUT', 60 * 60 * 24),
+)
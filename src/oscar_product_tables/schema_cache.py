@@ -0,0 +1,23 @@
+from django.conf import settings
+from .cache import VersionedCache
+
+__all__ = ['SchemaCache', 'schema_cache']
+
+
+class SchemaCache(VersionedCache):
+    """
+    The objects the plugins build their cols from, like the attributes with
+    their option groups and the partners. Changes to them bump the version.
+    """
+    version_key = 'product_tables:schema:version'
+
+    def get_or_set(self, name, default):
+        """ :param default: Callable that loads the objects on a miss """
+        key = f'product_tables:schema:{self.get_version()}:{name}'
+        return self.cache.get_or_set(key, default, self.timeout)
+
+
+schema_cache = SchemaCache(
+    alias=getattr(settings, 'PRODUCT_TABLES_SCHEMA_CACHE', None),
+    timeout=getattr(settings, 'PRODUCT_TABLES_SCHEMA_CACHE_TIMEOUT', 300),
+)
@@ -0,0 +1,81 @@
+from django.conf import settings
+from django.db import transaction
+from oscar.core.loading import get_model
+from .models import ProductTableSnapshot
+
+Product = get_model('catalogue', 'Product')
+
+__all__ = ['SnapshotStore', 'snapshot_store']
+
+
+class SnapshotStore:
+    """
+    Keeps a ProductTableSnapshot per product up to date. The plugins write
+    their part of it with get_snapshot and read it back instead of querying
+    their models. Products without a snapshot are read live.
+    """
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+
+    @property
+    def plugin_classes(self):
+        from .table import Table
+        return Table.all_plugin_classes
+
+    def build(self, product_ids):
+        """ :returns: List of unsaved snapshots of the existing products """
+        product_ids = list(Product.objects.filter(
+            pk__in=product_ids).values_list('pk', flat=True))
+        data = {pk: {} for pk in product_ids}
+        for cls in self.plugin_classes:
+            for pk, values in cls.get_snapshot(product_ids).items():
+                data[pk][cls.cell_class.type] = values
+        snapshots = []
+        for pk, values in data.items():
+            snapshot = ProductTableSnapshot(product_id=pk)
+            snapshot.set_data(values)
+            snapshots.append(snapshot)
+        return snapshots
+
+    def refresh(self, product_ids):
+        """ Rebuilds the snapshots of the products in one transaction """
+        snapshots = self.build(product_ids)
+        with transaction.atomic():
+            ProductTableSnapshot.objects.filter(
+                product__in=product_ids).delete()
+            ProductTableSnapshot.objects.bulk_create(snapshots)
+        return snapshots
+
+    def refresh_on_commit(self, *product_ids):
+        """
+        Refreshes after the transaction is committed, when every change is
+        written and deleted products are gone. Inside a transaction, e.g.
+        with ATOMIC_REQUESTS, the snapshots are deleted right away, so the
+        products are read live until then.
+        """
+        if self.enabled and product_ids:
+            if transaction.get_connection().in_atomic_block:
+                self.delete(product__in=product_ids)
+            transaction.on_commit(lambda: self.refresh(product_ids))
+
+    def delete(self, **filters):
+        """ Stale snapshots are deleted, their products are read live """
+        if self.enabled:
+            ProductTableSnapshot.objects.filter(**filters).delete()
+
+    def rebuild(self, chunk_size=500):
+        """ Yields the number of products refreshed per chunk """
+        ids = []
+        qs = Product.objects.order_by('pk').values_list('pk', flat=True)
+        for pk in qs.iterator(chunk_size=chunk_size):
+            ids.append(pk)
+            if len(ids) == chunk_size:
+                yield len(self.refresh(ids))
+                ids = []
+        if ids:
+            yield len(self.refresh(ids))
+
+
+snapshot_store = SnapshotStore(
+    enabled=getattr(settings, 'PRODUCT_TABLES_SNAPSHOTS', False),
+)
@@ -21,7 +21,9 @@ function getForm(td){
 	}).done(function(){
 			var form = td.find('form');
 			var field = form.find('.form-control').first();
-			if (field.is('select')){
+			if (field.data('options-url')){
+				initRemoteOptions(field);
+			}else if (field.is('select')){
 				field.select2();
 			}else{
 				field.select();
@@ -30,6 +32,23 @@ function getForm(td){
 }
 
 
+function initRemoteOptions(field){
+	/* Big option groups are searched page by page on the server */
+	field.select2({
+		allowClear: !field.prop('multiple'),
+		placeholder: '',
+		ajax: {
+			url: field.data('options-url'),
+			dataType: 'json',
+			delay: 250,
+			data: function(params){
+				return {term: params.term || '', page: params.page || 1};
+			},
+		},
+	});
+}
+
+
 function submitButtonClicked(button, action){
     var form = button.closest('form');
 	var url = form.attr('action') + action + '/';
@@ -54,6 +73,205 @@ function submitFormToUrl(form, url){
 }
 
 
+function saveCells(table, edits){
+	/* Saves a list of {productid, code, values} at once and shows the results */
+	return $.ajax({
+		type: "POST",
+		url: batchSaveUrl,
+		data: JSON.stringify({edits: edits}),
+		contentType: 'application/json',
+		headers: {'X-CSRFToken': getCookie('csrftoken')},
+		success: function(data) {
+			var codes = table.find('thead th').map(function(){
+				return $(this).data('code');
+			}).get();
+			$.each(data.cells, function(index, cell){
+				var tr = table.find('tr[data-productid="' + cell.productid + '"]');
+				tr.children().eq(codes.indexOf(cell.code)).html(cell.value);
+			});
+		},
+	});
+}
+
+
+function getCookie(name){
+	var match = document.cookie.match('(^|;)\\s*' + name + '=([^;]*)');
+	return match ? decodeURIComponent(match[2]) : null;
+}
+
+
+function loadChunks(table, urls, concurrency){
+	/* Fetches up to concurrency chunks at once and inserts them in order */
+	var tbody = table.find('tbody');
+	var chunks = new Array(urls.length);
+	var next = 0;
+	var inserted = 0;
+
+	function insertReady(){
+		while (inserted < urls.length && chunks[inserted] !== undefined){
+			tbody.append(chunks[inserted]);
+			chunks[inserted] = null;
+			inserted++;
+		}
+		setProgress(urls.length ? Math.round(inserted / urls.length * 100) : 100);
+		if (inserted == urls.length){
+			initDataTable(table);
+		}
+	}
+
+	function fetchChunk(index, attempt){
+		$.get(urls[index]).done(function(data){
+			chunks[index] = data;
+			insertReady();
+			fetchNext();
+		}).fail(function(){
+			if (attempt < 3){
+				setTimeout(function(){ fetchChunk(index, attempt + 1); }, 1000 * attempt);
+			}
+		});
+	}
+
+	function fetchNext(){
+		if (next < urls.length){
+			fetchChunk(next++, 1);
+		}
+	}
+
+	for (var i = 0; i < Math.max(1, concurrency); i++){
+		fetchNext();
+	}
+	if (!urls.length){
+		insertReady();
+	}
+}
+
+
+function setProgress(progress){
+	var progressbar = $('#producttable-progress').find('.progress-bar');
+	progressbar.css('width', progress + '%');
+	progressbar.attr('aria-valuenow', progress);
+}
+
+
+function initDataTable(table){
+	/* Same setup as the last page of the htmx page chain */
+	table.DataTable({
+		pageLength: 25,
+		order: [],
+		language: {
+			searchPlaceholder: "Search records"
+		},
+		lengthMenu: [ [25, 100, 250, 500, -1], [25, 100, 250, 500, "Alle"] ],
+		search: {
+			return: true
+		},
+	});
+	$('#producttable-progress').remove();
+	table.show();
+}
+
+
+function initServerSideTable(table, url){
+	/* DataTables requests every page filtered and sorted by the server */
+	var columns = table.find('thead th').map(function(){
+		return {data: $(this).data('code')};
+	}).get();
+	table.DataTable({
+		serverSide: true,
+		processing: true,
+		ajax: url,
+		columns: columns,
+		pageLength: 25,
+		order: [],
+		language: {
+			searchPlaceholder: "Search records"
+		},
+		lengthMenu: [ [25, 100, 250, 500, -1], [25, 100, 250, 500, "Alle"] ],
+		search: {
+			return: true
+		},
+		createdRow: serverSideCreatedRow,
+	});
+	$('#producttable-progress').remove();
+	table.show();
+}
+
+
+function serverSideCreatedRow(row, data){
+	/* Restores the cell attributes that table_page.html renders */
+	$(row).children('td').each(function(index){
+		var td = $(this);
+		var code = getCellCode(td, index);
+		var state = data.cells[code];
+		if (state == 'disabled'){
+			td.css({'color': '#eee', 'cursor': 'no-drop'});
+		}else if (state == 'read_only'){
+			td.addClass('read_only');
+		}else{
+			td.attr('onclick', 'getForm($(this));');
+		}
+		if (code == 'title'){
+			td.css('white-space', 'normal');
+		}
+	});
+}
+
+
+function getCellCode(td, index){
+	return td.closest('table').find('thead th').eq(index).data('code');
+}
+
+
+function syncRows(table, url, since, interval){
+	/* Polls the rows changed since the token and patches them in place */
+	setTimeout(function(){
+		if (!$.fn.dataTable.isDataTable(table)){
+			syncRows(table, url, since, interval);
+			return;
+		}
+		$.getJSON(url, {since: since}).done(function(data){
+			if (data.reload){
+				window.location.reload();
+			}else if (patchRows(table, data)){
+				since = data.since;
+			}
+		}).always(function(){
+			syncRows(table, url, since, interval);
+		});
+	}, interval);
+}
+
+
+function patchRows(table, data){
+	/* Replaces changed rows, adds new and drops removed ones. Rows with an
+	   open form are kept, false makes the next sync send them again. */
+	var dataTable = table.DataTable();
+	var nodes = {};
+	var complete = true;
+	dataTable.rows().nodes().each(function(node){
+		nodes[$(node).data('productid')] = node;
+	});
+	$.each(data.rows, function(index, row){
+		var node = nodes[row.productid];
+		if (!node){
+			dataTable.row.add($(row.html.trim()));
+		}else if ($(node).find('form').length){
+			complete = false;
+		}else{
+			$(node).html($(row.html.trim()).html());
+			dataTable.row(node).invalidate('dom');
+		}
+	});
+	$.each(data.removed, function(index, productid){
+		if (nodes[productid]){
+			dataTable.row(nodes[productid]).remove();
+		}
+	});
+	dataTable.draw(false);
+	return complete;
+}
+
+
 function createListeners(){
 	/* Listen to lazy-submit-form and lazy-get-form */
 	getFormListener();
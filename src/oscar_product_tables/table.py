@@ -1,6 +1,14 @@
+from itertools import islice
+from django.db import transaction
 from oscar_product_tables.plugins import *
 from oscar.core.loading import get_model
+from .change_log import change_log
+from .context import TableContext
+from .query_plan import QueryPlan
 from .row import Row
+from .facet_cache import facet_cache
+from .row_cache import row_cache
+from .snapshots import snapshot_store
 
 Product = get_model('catalogue', 'Product')
 
@@ -14,21 +22,47 @@ class Table:
     ]
 
     def __init__(self, queryset=None, plugin_classes=None, product=None,
-                 read_only=None, disabled=None):
+                 read_only=None, disabled=None, context=None, codes=None,
+                 scope=None):
         assert queryset is not None or product
         self.read_only = read_only or []
         self.disabled = disabled or []
+        self.context = context or TableContext()
+        self.codes = codes
+        self.scope = scope
         plugin_classes = plugin_classes or self.all_plugin_classes
+        self.plugin_classes = plugin_classes
         self.products = self.get_queryset(plugin_classes, queryset, product)
-        self.rows = [Row(product) for product in self.products]
+        with self.context.timings.phase('products'):
+            self.rows = [Row(self, index, product)
+                         for index, product in enumerate(self.products)]
+        self.row_index = {row.product.pk: row for row in self.rows}
         self.plugins = self.get_plugins(plugin_classes)
         self.cols = self.get_cols()
+        self.col_index = {}
+        for col in self.cols:
+            self.col_index.setdefault(col.code, col)
 
     def get_plugins(self, plugin_classes):
+        """
+        With codes only the plugins owning them are kept, the remaining
+        plugins are not instantiated once every code is found.
+        """
         plugins = []
+        missing = None if self.codes is None else set(self.codes)
         for cls in plugin_classes:
-            if cls not in self.disabled:
-                plugins.append(cls(self.rows, read_only=cls in self.read_only))
+            if cls in self.disabled:
+                continue
+            if missing is not None and not missing:
+                break
+            plugin = cls(self.rows, read_only=cls in self.read_only,
+                         context=self.context, codes=self.codes,
+                         scope=self.scope)
+            if missing is not None:
+                if not plugin.cols:
+                    continue
+                missing -= {col.code for col in plugin.cols}
+            plugins.append(plugin)
         return plugins
 
     def get_cols(self):
@@ -44,18 +78,100 @@ class Table:
             if not queryset:
                 qs = Product.objects.all()
             qs = qs.filter(id=product.id)
+        plugin_classes = [cls for cls in plugin_classes
+                          if cls not in self.disabled]
+        if self.context.using is not None:
+            qs = qs.using(self.context.using)
+        qs = self.get_query_plan(plugin_classes).apply(qs)
         for cls in plugin_classes:
-            if cls not in self.disabled:
-                qs = cls.product_queryset(qs)
+            qs = cls.product_queryset(qs)
         return qs
 
+    def get_query_plan(self, plugin_classes):
+        """ :returns: The merged QueryPlan of the plugins for the codes """
+        plan = QueryPlan()
+        for cls in plugin_classes:
+            plan = plan.merge(cls.get_query_plan(self.codes))
+        return plan
+
+    def extend(self, queryset):
+        """
+        Adds the products of the queryset as rows and fills the cols for them
+
+        :returns: List of the new rows
+        """
+        return self.add_products(
+            self.get_queryset(self.plugin_classes, queryset, None))
+
+    def add_products(self, products):
+        """ :returns: List of the new rows of the products """
+        timings = self.context.timings
+        start = len(self.rows)
+        with timings.phase('products'):
+            rows = [Row(self, start + index, product)
+                    for index, product in enumerate(products)]
+        self.rows.extend(rows)
+        self.row_index.update((row.product.pk, row) for row in rows)
+        for plugin in self.plugins:
+            with timings.phase(f'{plugin.code}-fill'):
+                plugin.fill_cols(rows)
+        return rows
+
+    def clear(self):
+        """ Releases the rows and the values of the cols, keeps the plugins """
+        self.rows = []
+        self.row_index = {}
+        for col in self.cols:
+            col.clear()
+
+    def iter_chunks(self, queryset, chunk_size=500):
+        """
+        Yields the rows of the queryset in chunks of chunk_size products, in
+        the order of the queryset. Every chunk is loaded with the prefetches
+        of the plugins and replaces the one before, so memory depends on the
+        chunk size and not on the size of the queryset.
+        """
+        if self.context.using is not None:
+            queryset = queryset.using(self.context.using)
+        pks = queryset.values_list('pk', flat=True).iterator(
+            chunk_size=chunk_size)
+        while True:
+            ids = list(islice(pks, chunk_size))
+            if not ids:
+                break
+            self.clear()
+            qs = self.get_queryset(
+                self.plugin_classes, Product.objects.filter(pk__in=ids), None)
+            products = {product.pk: product for product in qs}
+            yield self.add_products(
+                [products[pk] for pk in ids if pk in products])
+        self.clear()
+
+    def save_many(self, changes):
+        """
+        Saves the cleaned data of many cells in one transaction, every plugin
+        writes its cells in bulk
+
+        :param changes: List of (cell, data)
+        """
+        with transaction.atomic():
+            for plugin in self.plugins:
+                plugin_changes = [(cell, data) for cell, data in changes
+                                  if cell.col.plugin is plugin]
+                if plugin_changes:
+                    plugin.save_many(plugin_changes)
+        # Bulk writes send no signals
+        pks = {cell.product.pk for cell, data in changes}
+        row_cache.invalidate(*pks)
+        facet_cache.invalidate_all()
+        snapshot_store.refresh_on_commit(*pks)
+        change_log.log_on_commit(*pks)
+
     def get_row(self, product):
-        for row in self.rows:
-            if row.product == product:
-                return row
+        return self.row_index.get(product.pk, None)
 
     def get_field(self, product, code):
         row = self.get_row(product)
-        for cell in row.cells:
-            if cell.code == code:
-                return cell
+        col = self.col_index.get(code, None)
+        if col is not None:
+            return col.plugin.get_cell(row, col)
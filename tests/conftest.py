@@ -0,0 +1,26 @@
+import pytest
+from django.core.cache import caches
+from oscar.core.loading import get_model
+from oscar_product_tables.fixtures import generate_catalog
+
+Product = get_model('catalogue', 'Product')
+
+
+@pytest.fixture
+def category(db):
+    """ Category of a small synthetic catalog, see CatalogGenerator """
+    return generate_catalog(products=20, product_classes=2, attributes=8,
+                            partners=2)
+
+
+@pytest.fixture
+def products(category):
+    return Product.objects.filter(categories=category).order_by('pk')
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """ The versioned caches outlive the test database """
+    yield
+    for cache in caches.all():
+        cache.clear()
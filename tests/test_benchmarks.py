@@ -0,0 +1,59 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from oscar_product_tables.benchmarks import (
+    build_columnar, compare_layouts, get_scenarios, run_scenarios)
+from oscar_product_tables.context import TableContext
+from oscar_product_tables.fixtures import CatalogGenerator
+from oscar_product_tables.management.legacy import (
+    LegacyTable, build_per_cell)
+
+
+def test_legacy_table_holds_a_cell_object_per_row_and_col(products):
+    table = LegacyTable(products.all())
+    assert len(table.rows) == products.count()
+    for row in table.rows:
+        assert len(row.cells) == len(table.cols)
+        assert all(hasattr(cell, '__dict__') for cell in row.cells)
+
+
+def test_legacy_table_shows_the_data_of_the_columnar_table(products):
+    legacy = LegacyTable(products.all())
+    columnar = build_columnar(products.all(), context=TableContext())
+    for legacy_row, row in zip(legacy.rows, columnar.rows):
+        cells = {cell.code: cell for cell in row.cells}
+        for legacy_cell in legacy_row.cells:
+            cell = cells[legacy_cell.code]
+            assert legacy_cell.enabled == cell.enabled
+            if cell.enabled:
+                assert legacy_cell.data == cell.data, cell
+
+
+def test_compare_layouts(products):
+    results = compare_layouts(products.all(), {'per_cell': build_per_cell})
+    assert set(results) == {'columnar', 'per_cell'}
+    assert results['columnar']['retained_memory'] \
+        < results['per_cell']['retained_memory']
+
+
+def test_scenarios_call_the_views(db, admin_user):
+    generator = CatalogGenerator(products=10, product_classes=2,
+                                 attributes=8, partners=2)
+    category = generator.generate()
+    product = category.product_set.order_by('pk').first()
+    code = f'{generator.prefix}1'
+    options = [option.pk for option in generator.groups['option']]
+    results = run_scenarios(
+        get_scenarios(category, admin_user, product, code, options), 1)
+    assert set(results) == {
+        'table', 'page', 'data_view', 'ajax_get', 'ajax_save'}
+    value = product.attribute_values.get(attribute__code=code)
+    assert value.value_option_id in options
+
+
+def test_suite_refuses_a_test_database_on_disk(monkeypatch):
+    monkeypatch.setitem(connection.settings_dict['TEST'], 'NAME',
+                        'test.sqlite3')
+    with pytest.raises(CommandError):
+        call_command('product_tables_benchmark_suite', products=1)
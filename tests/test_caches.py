@@ -0,0 +1,22 @@
+from oscar.core.loading import get_model
+from oscar_product_tables.context import TableContext
+from oscar_product_tables.facet_cache import facet_cache
+from oscar_product_tables.schema_cache import schema_cache
+from oscar_product_tables.table import Table
+
+Partner = get_model('partner', 'Partner')
+
+
+def test_schema_cache_is_opt_in(products):
+    assert not schema_cache.enabled
+    Table(queryset=products.all(), context=TableContext())
+    Partner.objects.create(name='New partner', code='new-partner')
+    table = Table(queryset=products.all(), context=TableContext())
+    assert 'new-partner' in table.col_index
+
+
+def test_facet_cache_is_opt_in(db):
+    assert not facet_cache.enabled
+    counts = iter([1, 2])
+    assert facet_cache.get_or_set('facets', lambda: next(counts)) == 1
+    assert facet_cache.get_or_set('facets', lambda: next(counts)) == 2
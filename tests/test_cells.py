@@ -0,0 +1,74 @@
+from unittest import mock
+from django.contrib.sites.models import SiteManager
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from oscar_product_tables.benchmarks import render_page
+from oscar_product_tables.col import ColDescriptor
+from oscar_product_tables.context import TableContext
+from oscar_product_tables.forms import ProductFieldForm
+from oscar_product_tables.table import Table
+
+
+def count_render_queries(queryset, **table_kwargs):
+    with CaptureQueriesContext(connection) as queries:
+        render_page(queryset, **table_kwargs)
+    return len(queries)
+
+
+def get_context(show_sku=False):
+    context = TableContext()
+    context.show_sku = show_sku
+    return context
+
+
+def test_page_renders_without_per_cell_queries(products):
+    ids = list(products.values_list('pk', flat=True))
+    context = get_context()
+    render_page(products.all(), context=context)  # Warm up
+    half = count_render_queries(
+        products.filter(pk__in=ids[:len(ids) // 2]), context=context)
+    full = count_render_queries(products.all(), context=context)
+    assert half == full
+
+
+def test_page_renders_without_site_lookups(products):
+    context = get_context(show_sku=True)
+    with mock.patch.object(SiteManager, 'get_current') as get_current:
+        render_page(products.all(), context=context)
+    assert get_current.call_count == 0
+
+
+def test_cells_build_forms_without_queries(products):
+    table = Table(queryset=products.all(), context=get_context(True))
+    cols = [col for col in table.cols
+            if col.plugin.code in ('attached', 'price')]
+    with CaptureQueriesContext(connection) as queries:
+        for row in table.rows:
+            for col in cols:
+                ProductFieldForm(col.plugin.get_cell(row, col)).as_p()
+    assert len(queries) == 0
+
+
+def test_cells_delegate_to_the_descriptor(products):
+    table = Table(queryset=products.all(), context=get_context())
+    row = table.rows[0]
+    for col in table.cols:
+        col.descriptor = ColDescriptor(
+            accessor=col.descriptor.accessor,
+            formatter=lambda value: 'formatted',
+            field_factory=lambda value: {'factory': value},
+        )
+        cell = col.plugin.get_cell(row, col)
+        assert cell.data == 'formatted'
+        assert cell.fields in ({'factory': cell.value},
+                               {col.code: {'factory': cell.value}})
+
+
+def test_partner_cells_read_show_sku_from_the_context(products):
+    for show_sku, fields in ((True, ['partner_sku', 'price']),
+                             (False, ['price'])):
+        table = Table(queryset=products.all(), context=get_context(show_sku))
+        col = next(col for col in table.cols if col.plugin.code == 'price')
+        cell = col.plugin.get_cell(table.rows[0], col)
+        assert cell.show_sku is show_sku
+        assert [*cell.fields] == fields
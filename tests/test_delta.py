@@ -0,0 +1,60 @@
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from oscar_product_tables.change_log import change_log
+from oscar_product_tables.table import Table
+
+
+@pytest.fixture
+def log(monkeypatch):
+    monkeypatch.setattr(change_log, 'enabled', True)
+    monkeypatch.setattr(change_log, 'overlap', 0)
+    return change_log
+
+
+def get_delta(client, category, since):
+    return client.get(reverse('product_tables_dashboard:product-table-delta',
+                              args=[category.slug]), {'since': since})
+
+
+def test_delta_has_the_changed_and_removed_rows(
+        log, admin_client, category, products,
+        django_capture_on_commit_callbacks):
+    first, second, third = products[:3]
+    since = timezone.now().isoformat()
+    table = Table(queryset=products.filter(pk=first.pk), codes=['bench0'])
+    with django_capture_on_commit_callbacks(execute=True):
+        table.get_field(table.rows[0].product, 'bench0').save(bench0='Delta')
+        second.categories.remove(category)
+    response = get_delta(admin_client, category, since)
+    assert response.status_code == 200
+    delta = response.json()
+    assert not delta['reload']
+    assert [row['productid'] for row in delta['rows']] == [first.pk]
+    assert 'Delta' in delta['rows'][0]['html']
+    assert delta['removed'] == [second.pk]
+    assert third.pk not in delta['removed']
+
+    delta = get_delta(admin_client, category, delta['since']).json()
+    assert delta['rows'] == [] and delta['removed'] == []
+
+
+def test_delta_reloads_above_the_limit(
+        log, admin_client, category, products, monkeypatch,
+        django_capture_on_commit_callbacks):
+    monkeypatch.setattr(log, 'limit', 1)
+    since = timezone.now().isoformat()
+    with django_capture_on_commit_callbacks(execute=True):
+        for product in products[:2]:
+            product.categories.remove(category)
+    assert get_delta(admin_client, category, since).json()['reload']
+
+
+def test_delta_needs_a_valid_since(log, admin_client, category):
+    assert get_delta(admin_client, category, 'yesterday').status_code == 400
+
+
+def test_delta_needs_the_change_log(admin_client, category):
+    assert not change_log.enabled
+    since = timezone.now().isoformat()
+    assert get_delta(admin_client, category, since).status_code == 404
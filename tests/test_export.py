@@ -0,0 +1,113 @@
+import csv
+import io
+from datetime import datetime
+import pytest
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from oscar.core.loading import get_model
+from openpyxl import load_workbook
+from oscar_product_tables.context import TableContext
+from oscar_product_tables.export import TableExport
+from oscar_product_tables.importer import TableImport
+
+ProductAttribute = get_model('catalogue', 'ProductAttribute')
+ProductAttributeValue = get_model('catalogue', 'ProductAttributeValue')
+ProductClass = get_model('catalogue', 'ProductClass')
+
+ATTACHED_FIELDS = ['is_public', 'structure', 'product_class']
+
+
+@pytest.fixture
+def released(products):
+    """ A datetime attribute value of the first product """
+    product = products.first()
+    attribute = ProductAttribute.objects.create(
+        product_class=product.product_class, name='Released',
+        code='released', type='datetime')
+    value = timezone.make_aware(datetime(2021, 3, 4, 5, 6, 7))
+    ProductAttributeValue.objects.create(
+        product=product, attribute=attribute, value_datetime=value)
+    return product, value
+
+
+def export(client, category, file_format):
+    response = client.get(
+        reverse('product_tables_dashboard:product-table-export',
+                args=[category.slug]), {'format': file_format})
+    assert response.status_code == 200
+    return b''.join(response.streaming_content)
+
+
+def read_xlsx(content):
+    sheet = load_workbook(io.BytesIO(content), read_only=True).active
+    return [list(row) for row in sheet.iter_rows(values_only=True)]
+
+
+def read_csv(content):
+    return list(csv.reader(io.StringIO(content.decode())))
+
+
+@override_settings(OSCAR_ATTACHED_PRODUCT_FIELDS=ATTACHED_FIELDS)
+def test_xlsx_export(admin_client, category, products, released):
+    product, value = released
+    header, *rows = read_xlsx(export(admin_client, category, 'xlsx'))
+    assert header[:6] == ['productid', 'upc', 'title', *ATTACHED_FIELDS]
+    assert len(rows) == products.count()
+    row = dict(zip(header, rows[0]))
+    assert row['productid'] == product.pk
+    assert row['product_class'] == product.product_class_id
+    assert row['released'] == timezone.make_naive(value)
+
+
+@override_settings(OSCAR_ATTACHED_PRODUCT_FIELDS=ATTACHED_FIELDS)
+def test_csv_export(admin_client, category, products, released):
+    product, value = released
+    header, *rows = read_csv(export(admin_client, category, 'csv'))
+    assert len(rows) == products.count()
+    row = dict(zip(header, rows[0]))
+    assert row['upc'] == product.upc
+    assert row['product_class'] == str(product.product_class_id)
+    assert row['released'] == str(timezone.make_naive(value))
+
+
+def test_unknown_format(admin_client, category):
+    response = admin_client.get(
+        reverse('product_tables_dashboard:product-table-export',
+                args=[category.slug]), {'format': 'pdf'})
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize('file_format', ['csv', 'xlsx'])
+@override_settings(OSCAR_ATTACHED_PRODUCT_FIELDS=ATTACHED_FIELDS)
+def test_export_imports_again(category, products, released, file_format):
+    product = products.last()
+    product.upc = None
+    product.save()
+    content = b''.join(
+        chunk if isinstance(chunk, bytes) else chunk.encode()
+        for chunk in TableExport(
+            products, context=TableContext()).iter_format(file_format))
+    result = TableImport(context=TableContext()).run(
+        io.BytesIO(content), file_format)
+    assert result['errors'] == []
+    assert result['changes'] == []
+    assert result['rows'] == products.count()
+
+
+@override_settings(OSCAR_ATTACHED_PRODUCT_FIELDS=ATTACHED_FIELDS)
+def test_import_by_productid(category, products):
+    product = products.last()
+    product.upc = None
+    product.save()
+    other_class = ProductClass.objects.exclude(pk=product.product_class_id).first()
+    content = (f'productid,upc,title,product_class\n'
+               f'{product.pk},,Imported,{other_class.pk}\n').encode()
+    result = TableImport(context=TableContext()).run(io.BytesIO(content))
+    assert result['errors'] == []
+    assert {change['code'] for change in result['changes']} == {
+        'title', 'product_class'}
+    product.refresh_from_db()
+    assert product.title == 'Imported'
+    assert product.product_class == other_class
+    assert not product.upc
@@ -0,0 +1,77 @@
+from collections import Counter
+import pytest
+from django.urls import reverse
+from oscar.core.loading import get_model
+from oscar_product_tables.facet_cache import facet_cache
+from oscar_product_tables.plugins import PartnerFieldsPlugin
+
+ProductAttributeValue = get_model('catalogue', 'ProductAttributeValue')
+StockRecord = get_model('partner', 'StockRecord')
+
+
+def get_facets(client, category, code):
+    return client.get(reverse('product_tables_dashboard:product-table-facets',
+                              args=[category.slug, code]))
+
+
+def counts(client, category, code):
+    response = get_facets(client, category, code)
+    assert response.status_code == 200
+    return {facet['label']: facet['count']
+            for facet in response.json()['facets']}
+
+
+def test_attached_facets(admin_client, category, products):
+    products.filter(pk=products.first().pk).update(is_public=False)
+    facets = get_facets(admin_client, category, 'is_public').json()['facets']
+    assert {facet['value']: facet['count'] for facet in facets} == {
+        False: 1, True: products.count() - 1}
+
+
+def test_option_facets(admin_client, category, products):
+    values = ProductAttributeValue.objects.filter(
+        product__in=products, attribute__code='bench1')
+    expected = Counter(value.value_option.option for value in values)
+    assert counts(admin_client, category, 'bench1') == expected
+
+
+def test_multi_option_facets_count_products(admin_client, category, products):
+    values = ProductAttributeValue.objects.filter(
+        product__in=products, attribute__code='bench3')
+    expected = Counter(option.option for value in values
+                       for option in value.value_multi_option.all())
+    assert counts(admin_client, category, 'bench3') == expected
+
+
+def test_price_facets(admin_client, category, products):
+    stockrecord = StockRecord.objects.filter(product__in=products).first()
+    partner = stockrecord.partner
+    size = PartnerFieldsPlugin.price_bucket
+    expected = Counter()
+    for price in StockRecord.objects.filter(
+            product__in=products, partner=partner).values_list(
+                'price', flat=True):
+        low = int(price // size) * size
+        expected[f'{low}€ - {low + size}€'] += 1
+    assert counts(admin_client, category, partner.code) == expected
+
+
+@pytest.mark.parametrize('code', ['bench7', 'unknown'])
+def test_no_facets(admin_client, category, code):
+    assert get_facets(admin_client, category, code).status_code == 404
+
+
+def test_cached_facets_until_a_write(admin_client, category, products,
+                                     monkeypatch):
+    monkeypatch.setattr(facet_cache, 'alias', 'default')
+    before = counts(admin_client, category, 'bench2')
+    value = ProductAttributeValue.objects.filter(
+        product__in=products, attribute__code='bench2').first()
+    ProductAttributeValue.objects.filter(pk=value.pk).update(
+        value_integer=-1)
+    assert counts(admin_client, category, 'bench2') == before
+    value.value_integer = -1
+    value.save()
+    after = counts(admin_client, category, 'bench2')
+    assert after['-1'] == 1
+    assert sum(after.values()) == sum(before.values())
@@ -0,0 +1,25 @@
+import pytest
+from oscar_product_tables.context import TableContext
+from oscar_product_tables.instrumentation import instrumentation
+from oscar_product_tables.table import Table
+
+
+@pytest.fixture
+def timings_enabled(monkeypatch):
+    monkeypatch.setattr(instrumentation, 'enabled', True)
+
+
+@pytest.mark.django_db(transaction=True, databases=['default', 'replica'])
+@pytest.mark.parametrize('using', [None, 'replica'])
+def test_queries_are_counted_on_the_database_of_the_table(
+        timings_enabled, products, using):
+    context = TableContext(using=using)
+    Table(queryset=products.all(), codes=['title'], context=context)
+    assert context.timings.phases['products']['queries'] == 1
+
+
+@pytest.mark.django_db(transaction=True, databases=['default', 'replica'])
+def test_primary_and_read_database_are_counted(timings_enabled):
+    assert TableContext(using='replica').timings.aliases \
+        == ['default', 'replica']
+    assert TableContext().timings.aliases == ['default']
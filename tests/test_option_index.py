@@ -0,0 +1,72 @@
+import pytest
+from django.db import connection
+from django.urls import reverse
+from django.test.utils import CaptureQueriesContext
+from oscar.core.loading import get_model
+from oscar_product_tables.option_index import option_index
+
+AttributeOption = get_model('catalogue', 'AttributeOption')
+AttributeOptionGroup = get_model('catalogue', 'AttributeOptionGroup')
+
+
+@pytest.fixture
+def group(db):
+    group = AttributeOptionGroup.objects.create(name='Colors')
+    AttributeOption.objects.bulk_create([
+        AttributeOption(group=group, option=f'Color {number}')
+        for number in range(120)])
+    return group
+
+
+@pytest.fixture(params=[None, 'default'], ids=['database', 'index'])
+def index(request, monkeypatch):
+    monkeypatch.setattr(option_index, 'alias', request.param)
+    return option_index
+
+
+def test_search_pages(index, group):
+    first, more = index.search(group.pk, 'color', 1)
+    assert len(first) == index.page_size and more
+    third, more = index.search(group.pk, 'color', 3)
+    assert len(third) == 120 - 2 * index.page_size and not more
+    assert first[0] == (group.options.order_by('pk').first().pk, 'Color 0')
+
+
+def test_search_term(index, group):
+    options, more = index.search(group.pk, 'OR 11', 1)
+    assert [option for pk, option in options] == [
+        'Color 11', *[f'Color {number}' for number in range(110, 120)]]
+    assert not more
+
+
+def test_is_remote_counts_the_options(index, group, monkeypatch):
+    monkeypatch.setattr(index, 'remote_from', 100)
+    with CaptureQueriesContext(connection) as queries:
+        assert index.is_remote(group.pk)
+        assert index.is_remote(group.pk)
+    counts = [query['sql'] for query in queries
+              if 'catalogue_attributeoption' in query['sql']]
+    assert len(counts) == (1 if index.enabled else 2)
+    assert all('COUNT(' in sql for sql in counts)
+    monkeypatch.setattr(index, 'remote_from', 121)
+    assert not index.is_remote(group.pk)
+
+
+def get_options(client, group):
+    return client.get(reverse('product_tables_dashboard:product-table-options',
+                              args=[group.pk]), {'term': 'color 11'})
+
+
+def test_option_view(admin_client, group):
+    response = get_options(admin_client, group)
+    assert response.status_code == 200
+    assert [result['text'] for result in response.json()['results']] == [
+        'Color 11', *[f'Color {number}' for number in range(110, 120)]]
+
+
+def test_option_view_checks_the_user_like_the_table(client, group,
+                                                    django_user_model):
+    user = django_user_model.objects.create_user(
+        'staff', 'staff@example.com', 'password', is_staff=True)
+    client.force_login(user)
+    assert get_options(client, group).status_code == 403
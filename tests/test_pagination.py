@@ -0,0 +1,62 @@
+import pytest
+from django.core.paginator import InvalidPage
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from oscar_product_tables.count_cache import count_cache
+from oscar_product_tables.pagination import KeysetPaginator
+
+
+def walk(paginator):
+    """ :returns: List of the pks of every page, following the cursors """
+    pages = []
+    number, cursor = 1, None
+    while True:
+        page = paginator.page(number, cursor)
+        pages.append(page.pks)
+        if not page.has_next():
+            return pages
+        number, cursor = page.next_page_number(), page.next_cursor
+
+
+def test_pages_without_cursor_start_at_their_number(products):
+    paginator = KeysetPaginator(products, per_page=6)
+    pages = walk(paginator)
+    assert len(pages) == 4
+    for number, pks in enumerate(pages, 1):
+        page = paginator.page(number)
+        assert page.number == number
+        assert page.pks == pks
+        assert page.has_next() == (number < len(pages))
+
+
+def test_cursors_find_the_same_pages(products):
+    paginator = KeysetPaginator(products, per_page=6)
+    pages = walk(paginator)
+    for number, cursor in enumerate(paginator.get_cursors(), 1):
+        assert paginator.page(number, cursor).pks == pages[number - 1]
+
+
+@pytest.mark.parametrize('number', [0, -1, 5, 'two'])
+def test_invalid_page_numbers(products, number):
+    with pytest.raises(InvalidPage):
+        KeysetPaginator(products, per_page=6).page(number)
+
+
+def test_count_is_not_cached_by_default(products):
+    assert not count_cache.enabled
+    paginator = KeysetPaginator(products, per_page=6, cache_key='shoes')
+    count = paginator.count
+    products.first().categories.clear()
+    assert paginator.count == count - 1
+
+
+def test_cached_count_until_a_product_leaves(products, monkeypatch):
+    monkeypatch.setattr(count_cache, 'alias', 'default')
+    paginator = KeysetPaginator(products, per_page=6, cache_key='shoes')
+    paginator.get_cursors()
+    count = products.count()
+    with CaptureQueriesContext(connection) as queries:
+        assert paginator.count == count
+    assert len(queries) == 0
+    products.first().categories.clear()
+    assert paginator.count == count - 1
@@ -0,0 +1,79 @@
+import re
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from oscar.core.loading import get_model
+from oscar_product_tables.context import TableContext
+from oscar_product_tables.query_plan import QueryPlan
+from oscar_product_tables.schema_cache import schema_cache
+from oscar_product_tables.table import Table
+
+Partner = get_model('partner', 'Partner')
+ProductAttribute = get_model('catalogue', 'ProductAttribute')
+
+
+@pytest.fixture(autouse=True)
+def no_schema_cache(monkeypatch):
+    """ Every test loads the schema, so the counts do not depend on order """
+    monkeypatch.setattr(schema_cache, 'alias', None)
+
+
+def build(products, codes):
+    context = TableContext()
+    with CaptureQueriesContext(connection) as queries:
+        table = Table(queryset=products.all(), codes=codes, context=context)
+    return table, [query['sql'] for query in queries]
+
+
+def selected_columns(sql, db_table):
+    """ :returns: Set of the columns of db_table in the SELECT clause """
+    select = sql.split(' FROM ', 1)[0]
+    return set(re.findall(rf'"{db_table}"\."(\w+)"', select))
+
+
+def product_columns(*fields):
+    return {'id', 'upc', 'slug', 'structure', 'product_class_id',
+            'parent_id', 'date_updated', *fields}
+
+
+def test_attached_col_loads_only_its_field(products):
+    table, queries = build(products, ['title'])
+    assert [col.code for col in table.cols] == ['title']
+    assert len(queries) == 1
+    assert selected_columns(queries[0], 'catalogue_product') \
+        == product_columns('title')
+
+
+def test_partner_col_loads_only_its_stockrecords(products):
+    partner = Partner.objects.order_by('pk').first()
+    table, queries = build(products, [partner.code])
+    assert [col.code for col in table.cols] == [partner.code]
+    # Products, attributes and partners of the codes, stockrecords
+    assert len(queries) == 4
+    assert selected_columns(queries[0], 'catalogue_product') \
+        == product_columns()
+    stockrecords = queries[-1]
+    assert selected_columns(stockrecords, 'partner_stockrecord') \
+        == {'product_id', 'partner_id', 'partner_sku', 'price'}
+    assert f'"partner_stockrecord"."partner_id" IN ({partner.pk})' \
+        in stockrecords
+
+
+def test_attribute_col_loads_only_its_values(products):
+    code = ProductAttribute.objects.order_by('code').first().code
+    table, queries = build(products, [code])
+    assert [col.code for col in table.cols] == [code]
+    # Products, attributes of the codes, values, codes per product class
+    assert len(queries) == 4
+    assert selected_columns(queries[0], 'catalogue_product') \
+        == product_columns()
+    assert not any('partner_stockrecord' in sql for sql in queries)
+    assert any(all(part in sql for part in (
+        '"catalogue_productattribute"."code" IN',
+        'catalogue_productattributevalue')) for sql in queries)
+
+
+def test_query_plan_can_be_switched_off(monkeypatch, products):
+    monkeypatch.setattr(QueryPlan, 'enabled', False)
+    table, queries = build(products, ['title'])
+    assert 'description' in selected_columns(queries[0], 'catalogue_product')
@@ -0,0 +1,65 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.template.loader import get_template
+from django.test.client import RequestFactory
+from django.test.utils import override_settings
+from django.urls import reverse
+from oscar.core.loading import get_model
+from oscar_product_tables.context import TableContext
+from oscar_product_tables.dashboard.views import GetTableMixin
+from oscar_product_tables.plugins import PartnerFieldsPlugin
+from oscar_product_tables.renderer import RowRenderer
+from oscar_product_tables.table import Table
+
+ProductAttributeValue = get_model('catalogue', 'ProductAttributeValue')
+
+
+@pytest.fixture
+def products(products):
+    """ Markup in the data, a boolean and a missing value """
+    first, second = products[:2]
+    products.filter(pk=first.pk).update(title='<b>Tom & "Jerry"</b>')
+    ProductAttributeValue.objects.filter(
+        product=first, attribute__code='bench5').update(value_boolean=False)
+    ProductAttributeValue.objects.filter(
+        product=second, attribute__code='bench0').delete()
+    return products
+
+
+def render_both(table, user):
+    request = RequestFactory().get('/')
+    request.user = user
+    template = get_template('product_tables/row.html')
+    return ([template.render({'row': row, 'request': request})
+             for row in table.rows],
+            RowRenderer(request).render_rows(table.rows))
+
+
+@pytest.mark.parametrize('superuser', [False, True])
+@pytest.mark.parametrize('show_sku', [False, True])
+@pytest.mark.parametrize('read_only', [[], [PartnerFieldsPlugin]])
+def test_renderer_matches_the_template(products, admin_user, superuser,
+                                       show_sku, read_only):
+    user = admin_user if superuser else AnonymousUser()
+    with override_settings(DATATABLES_SHOW_SKU=show_sku):
+        table = Table(queryset=products.all(), read_only=read_only,
+                      context=TableContext())
+        template_html, python_html = render_both(table, user)
+    assert len(python_html) == products.count()
+    assert python_html == template_html
+
+
+def test_renderer_matches_with_disabled_cells(products, admin_user):
+    table = Table(queryset=products.all(), context=TableContext())
+    assert any(not cell.enabled for row in table.rows for cell in row.cells)
+    template_html, python_html = render_both(table, admin_user)
+    assert python_html == template_html
+
+
+def test_fast_rows_render_the_same_page(admin_client, category, products,
+                                        monkeypatch):
+    url = reverse('product_tables_dashboard:product-table',
+                  args=[category.slug])
+    template_page = admin_client.get(url, {'page': 1}).content
+    monkeypatch.setattr(GetTableMixin, 'fast_rows', True)
+    assert admin_client.get(url, {'page': 1}).content == template_page
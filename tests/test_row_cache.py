@@ -0,0 +1,82 @@
+import json
+import pytest
+from django.urls import reverse
+from oscar.core.loading import get_model
+from oscar_product_tables.row_cache import row_cache
+
+Partner = get_model('partner', 'Partner')
+ProductAttributeValue = get_model('catalogue', 'ProductAttributeValue')
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    monkeypatch.setattr(row_cache, 'alias', 'default')
+    return row_cache
+
+
+def get_rows(client, category):
+    response = client.get(reverse('product_tables_dashboard:product-table',
+                                  args=[category.slug]), {'page': 1})
+    assert response.status_code == 200
+    return response.content.decode()
+
+
+def rename_quietly(product, title):
+    """ Updates without signals, so only a new render shows the title """
+    product.__class__.objects.filter(pk=product.pk).update(title=title)
+
+
+def test_rows_are_served_from_the_cache(cache, admin_client, category,
+                                        products):
+    product = products.first()
+    get_rows(admin_client, category)
+    assert set(cache.get_many(products.values_list('pk', flat=True))) == set(
+        products.values_list('pk', flat=True))
+    rename_quietly(product, 'Quiet title')
+    assert 'Quiet title' not in get_rows(admin_client, category)
+
+
+def test_saved_product_is_rendered_again(cache, admin_client, category,
+                                         products):
+    product = products.first()
+    get_rows(admin_client, category)
+    product.title = 'Saved title'
+    product.save()
+    assert 'Saved title' in get_rows(admin_client, category)
+
+
+def test_saved_value_is_rendered_again(cache, admin_client, category,
+                                       products):
+    product = products.first()
+    get_rows(admin_client, category)
+    rename_quietly(product, 'Quiet title')
+    value = ProductAttributeValue.objects.filter(
+        product=product, attribute__code='bench2').first()
+    value.value_integer = 123456
+    value.save()
+    html = get_rows(admin_client, category)
+    assert '123456' in html and 'Quiet title' in html
+
+
+def test_batch_save_renders_the_rows_again(cache, admin_client, category,
+                                           products):
+    product = products.first()
+    get_rows(admin_client, category)
+    rename_quietly(product, 'Quiet title')
+    response = admin_client.post(
+        reverse('product_tables_dashboard:product-table-batch'),
+        json.dumps({'edits': [{'productid': product.pk, 'code': 'bench0',
+                               'values': {'bench0': 'Batch'}}]}),
+        content_type='application/json')
+    assert response.status_code == 200
+    assert 'Quiet title' in get_rows(admin_client, category)
+
+
+def test_schema_change_renders_every_row_again(cache, admin_client,
+                                               category, products):
+    get_rows(admin_client, category)
+    for product in products[:2]:
+        rename_quietly(product, f'Quiet {product.pk}')
+    Partner.objects.create(name='New partner', code='new-partner')
+    html = get_rows(admin_client, category)
+    assert all(f'Quiet {product.pk}' in html for product in products[:2])
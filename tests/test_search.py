@@ -0,0 +1,42 @@
+import pytest
+from oscar.core.loading import get_model
+from oscar_product_tables.context import TableContext
+from oscar_product_tables.table import Table
+
+Product = get_model('catalogue', 'Product')
+ProductAttributeValue = get_model('catalogue', 'ProductAttributeValue')
+
+
+@pytest.fixture
+def table(products):
+    return Table(queryset=products.all(), context=TableContext())
+
+
+def search(table, products, code, term):
+    return set(table.col_index[code].filter(products.all(), term)
+               .values_list('pk', flat=True))
+
+
+@pytest.mark.parametrize('term, value', [
+    ('true', True), ('Yes', True), ('1', True), ('True', True),
+    ('false', False), ('no', False), ('0', False), (' FALSE ', False),
+])
+def test_boolean_attribute_search(table, products, term, value):
+    values = ProductAttributeValue.objects.filter(attribute__type='boolean')
+    code = values.values_list('attribute__code', flat=True).first()
+    expected = set(values.filter(attribute__code=code, value_boolean=value)
+                   .values_list('product_id', flat=True))
+    assert expected
+    assert search(table, products, code, term) == expected
+
+
+@pytest.mark.parametrize('term, value', [('yes', True), ('no', False)])
+def test_boolean_field_search(table, products, term, value):
+    Product.objects.filter(pk=products.first().pk).update(is_public=False)
+    expected = set(products.filter(is_public=value)
+                   .values_list('pk', flat=True))
+    assert search(table, products, 'is_public', term) == expected
+
+
+def test_unknown_boolean_term_matches_nothing(table, products):
+    assert search(table, products, 'is_public', 'maybe') == set()
@@ -0,0 +1,87 @@
+import pytest
+from django.urls import reverse
+from oscar.core.loading import get_model
+
+ProductAttributeValue = get_model('catalogue', 'ProductAttributeValue')
+StockRecord = get_model('partner', 'StockRecord')
+
+CODES = ['upc', 'title', 'bench2']
+
+
+def get_page(client, category, order=(), codes=CODES, **params):
+    data = {'draw': 3}
+    for index, code in enumerate(codes):
+        data[f'columns[{index}][data]'] = code
+    for index, (code, direction) in enumerate(order):
+        data[f'order[{index}][column]'] = codes.index(code)
+        data[f'order[{index}][dir]'] = direction
+    data.update(params)
+    response = client.get(reverse(
+        'product_tables_dashboard:product-table-server-side',
+        args=[category.slug]), data)
+    assert response.status_code == 200
+    return response.json()
+
+
+def productids(page):
+    return [row['DT_RowAttr']['data-productid'] for row in page['data']]
+
+
+def ordered(values, reverse=False):
+    """ Product ids by value and pk, products without a value last """
+    present = sorted((value, pk) for pk, value in values.items()
+                     if value is not None)
+    if reverse:
+        present.sort(key=lambda item: (item[0], -item[1]), reverse=True)
+    return [pk for value, pk in present] + sorted(
+        pk for pk, value in values.items() if value is None)
+
+
+@pytest.mark.parametrize('direction', ['asc', 'desc'])
+def test_order_by_title(admin_client, category, products, direction):
+    page = get_page(admin_client, category, [('title', direction)],
+                    length=-1)
+    titles = dict(products.values_list('pk', 'title'))
+    assert productids(page) == ordered(titles, direction == 'desc')
+
+
+@pytest.mark.parametrize('direction', ['asc', 'desc'])
+def test_order_by_attribute_puts_missing_values_last(
+        admin_client, category, products, direction):
+    page = get_page(admin_client, category, [('bench2', direction)],
+                    length=-1)
+    values = dict.fromkeys(products.values_list('pk', flat=True))
+    values.update(ProductAttributeValue.objects.filter(
+        product__in=products, attribute__code='bench2').values_list(
+            'product_id', 'value_integer'))
+    assert productids(page) == ordered(values, direction == 'desc')
+
+
+def test_order_by_price(admin_client, category, products):
+    partner = StockRecord.objects.filter(product__in=products).first().partner
+    codes = [*CODES, partner.code]
+    page = get_page(admin_client, category, [(partner.code, 'asc')],
+                    codes=codes, length=-1)
+    prices = dict.fromkeys(products.values_list('pk', flat=True))
+    prices.update(StockRecord.objects.filter(
+        product__in=products, partner=partner).values_list(
+            'product_id', 'price'))
+    assert productids(page) == ordered(prices)
+
+
+def test_pages_of_the_ordering(admin_client, category, products):
+    everything = productids(get_page(admin_client, category,
+                                     [('title', 'asc')], length=-1))
+    page = get_page(admin_client, category, [('title', 'asc')],
+                    start=5, length=5)
+    assert page['draw'] == 3
+    assert page['recordsTotal'] == page['recordsFiltered'] == products.count()
+    assert productids(page) == everything[5:10]
+
+
+def test_search_filters_before_paging(admin_client, category, products):
+    product = products.first()
+    page = get_page(admin_client, category, **{'search[value]': product.upc})
+    assert page['recordsTotal'] == products.count()
+    assert page['recordsFiltered'] == 1
+    assert productids(page) == [product.pk]
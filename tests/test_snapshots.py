@@ -0,0 +1,51 @@
+import pytest
+from django.urls import reverse
+from oscar_product_tables.context import TableContext
+from oscar_product_tables.models import ProductTableSnapshot
+from oscar_product_tables.snapshots import snapshot_store
+from oscar_product_tables.table import Table
+
+
+@pytest.fixture
+def snapshots(monkeypatch, products):
+    monkeypatch.setattr(snapshot_store, 'enabled', True)
+    snapshot_store.refresh(list(products.values_list('pk', flat=True)))
+    return snapshot_store
+
+
+def get_data(product, code):
+    table = Table(queryset=product.__class__.objects.filter(pk=product.pk),
+                  codes=[code], context=TableContext())
+    return table.get_field(table.rows[0].product, code).data
+
+
+def test_snapshots_hold_the_table_data(snapshots, products):
+    product = products.first()
+    assert ProductTableSnapshot.objects.count() == products.count()
+    live = get_data(product, 'bench0')
+    snapshot = ProductTableSnapshot.objects.get(product=product)
+    assert snapshot.data['attribute']['values'].get('bench0') == live
+
+
+def test_saves_read_live_until_the_commit(snapshots, products,
+                                          django_capture_on_commit_callbacks):
+    product = products.first()
+    table = Table(queryset=products.filter(pk=product.pk), codes=['bench0'],
+                  context=TableContext())
+    cell = table.get_field(table.rows[0].product, 'bench0')
+    with django_capture_on_commit_callbacks(execute=True):
+        cell.save(bench0='Saved')
+        assert not ProductTableSnapshot.objects.filter(
+            product=product).exists()
+        assert get_data(product, 'bench0') == 'Saved'
+    snapshot = ProductTableSnapshot.objects.get(product=product)
+    assert snapshot.data['attribute']['values'].get('bench0') == 'Saved'
+
+
+def test_saved_cell_renders_the_new_value(snapshots, admin_client, products):
+    product = products.first()
+    url = reverse('product_tables_dashboard:product-table')
+    response = admin_client.post(f'{url}{product.pk}/bench0/save/', {
+        'productid': product.pk, 'code': 'bench0', 'bench0': 'Saved'})
+    assert response.status_code == 200
+    assert response.context['value'] == 'Saved'
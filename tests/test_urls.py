@@ -0,0 +1,15 @@
+import pytest
+from django import VERSION as DJANGO_VERSION
+from django.urls import resolve, reverse
+
+NAMESPACE = 'product_tables_dashboard'
+
+
+@pytest.mark.skipif(DJANGO_VERSION < (3, 1),
+                    reason='Async views need django 3.1')
+def test_async_routes_come_before_the_table_slug():
+    for args in ([], ['shoes']):
+        url = reverse(f'{NAMESPACE}:product-table-async', args=args)
+        assert resolve(url).url_name == 'product-table-async'
+    url = reverse(f'{NAMESPACE}:product-table', args=['shoes'])
+    assert resolve(url).url_name == 'product-table'
@@ -0,0 +1,196 @@
+import json
+from datetime import date
+import pytest
+from django import VERSION as DJANGO_VERSION
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from oscar.core.loading import get_model
+from oscar_product_tables.dashboard.views import (
+    GetTableMixin, ProductTableDataView)
+
+Product = get_model('catalogue', 'Product')
+
+
+def get_table_page(client, category):
+    return client.get(reverse('product_tables_dashboard:product-table',
+                              args=[category.slug]))
+
+
+def test_pages_load_one_after_another_by_default(admin_client, category):
+    assert GetTableMixin.chunk_concurrency == 0
+    response = get_table_page(admin_client, category)
+    assert response.status_code == 200
+    assert 'manifest' not in response.context
+    assert response.context['page'].number == 1
+
+
+def test_manifest_is_opt_in(admin_client, category, monkeypatch):
+    monkeypatch.setattr(GetTableMixin, 'chunk_concurrency', 4)
+    response = get_table_page(admin_client, category)
+    assert len(response.context['manifest']) == 1
+    assert b'loadChunks(' in response.content
+
+
+def upload(client, products, dry_run, title='Imported'):
+    product = products.first()
+    content = (f'productid,upc,title\n'
+               f'{product.pk},{product.upc},{title}\n').encode()
+    response = client.post(
+        reverse('product_tables_dashboard:product-table-import'),
+        {'file': SimpleUploadedFile('table.csv', content),
+         'dry_run': dry_run})
+    assert response.status_code == 200
+    product.refresh_from_db()
+    return product.title == title
+
+
+@pytest.mark.parametrize('dry_run', ['1', 'true', 'True', 'on'])
+def test_import_dry_run(admin_client, products, dry_run):
+    assert not upload(admin_client, products, dry_run)
+
+
+@pytest.mark.parametrize('dry_run', ['', '0', 'false', 'off'])
+def test_import_without_dry_run(admin_client, products, dry_run):
+    assert upload(admin_client, products, dry_run)
+
+
+requires_async = pytest.mark.skipif(
+    DJANGO_VERSION < (3, 1), reason='Async views need django 3.1')
+
+
+def get_async(client, *args):
+    from asgiref.sync import async_to_sync
+    url = reverse('product_tables_dashboard:product-table-async', args=args)
+
+    async def get():
+        return await client.get(url)
+    return async_to_sync(get)()
+
+
+@requires_async
+@pytest.mark.parametrize('slug', [False, True])
+def test_async_table_page(admin_client, admin_user, category, slug):
+    from django.test import AsyncClient
+    client = AsyncClient()
+    client.force_login(admin_user)
+    response = get_async(client, *([category.slug] if slug else []))
+    assert response.status_code == 200
+    assert response.context['page'].number == 1
+    expected = get_table_page(admin_client, category)
+    assert [template.name for template in response.templates] == [
+        template.name for template in expected.templates]
+
+
+@requires_async
+def test_async_table_page_needs_staff(category):
+    from django.test import AsyncClient
+    response = get_async(AsyncClient(), category.slug)
+    assert response.status_code == 302
+    assert 'login' in response['Location']
+
+
+def post_cell(client, product, code, data):
+    url = reverse('product_tables_dashboard:product-table')
+    return client.post(f'{url}{product.pk}/{code}/save/', {
+        'productid': product.pk, 'code': code, **data})
+
+
+def get_value(product, code):
+    value = product.attribute_values.filter(attribute__code=code).first()
+    return value.value if value is not None else None
+
+
+@pytest.mark.parametrize('code, value, expected', [
+    ('bench0', 'Saved', 'Saved'),
+    ('bench2', '42', 42),
+    ('bench6', '2021-03-04', date(2021, 3, 4)),
+    ('bench0', '', None),
+])
+def test_cell_saves_attribute_values(admin_client, products, code, value,
+                                     expected):
+    product = products.first()
+    response = post_cell(admin_client, product, code, {code: value})
+    assert response.status_code == 200
+    assert get_value(product, code) == expected
+
+
+def post_batch(client, edits):
+    return client.post(reverse('product_tables_dashboard:product-table-batch'),
+                       json.dumps({'edits': edits}),
+                       content_type='application/json')
+
+
+def test_batch_saves_every_edit(admin_client, products):
+    first, second = products[:2]
+    option = first.product_class.attributes.get(
+        code='bench1').option_group.options.order_by('pk').first()
+    multi_options = list(first.product_class.attributes.get(
+        code='bench3').option_group.options.order_by('pk')[:2])
+    response = post_batch(admin_client, [
+        {'productid': first.pk, 'code': 'bench0',
+         'values': {'bench0': 'Batch'}},
+        {'productid': first.pk, 'code': 'bench1',
+         'values': {'bench1': option.pk}},
+        {'productid': first.pk, 'code': 'bench3',
+         'values': {'bench3': [option.pk for option in multi_options]}},
+        {'productid': second.pk, 'code': 'bench2',
+         'values': {'bench2': ''}},
+        {'productid': second.pk, 'code': 'title',
+         'values': {'title': 'Batch title'}},
+    ])
+    assert response.status_code == 200
+    cells = response.json()['cells']
+    assert [cell['code'] for cell in cells] == [
+        'bench0', 'bench1', 'bench3', 'bench2', 'title']
+    assert cells[0]['value'] == 'Batch'
+    assert get_value(first, 'bench0') == 'Batch'
+    assert get_value(first, 'bench1') == option
+    assert list(get_value(first, 'bench3').order_by('pk')) == multi_options
+    assert get_value(second, 'bench2') is None
+    second.refresh_from_db()
+    assert second.title == 'Batch title'
+
+
+def test_batch_saves_nothing_with_an_invalid_edit(admin_client, products):
+    product = products.first()
+    before = get_value(product, 'bench0')
+    response = post_batch(admin_client, [
+        {'productid': product.pk, 'code': 'bench0',
+         'values': {'bench0': 'Batch'}},
+        {'productid': product.pk, 'code': 'bench2',
+         'values': {'bench2': 'not a number'}},
+        {'productid': product.pk, 'code': 'bench8',
+         'values': {'bench8': 'Other class'}},
+    ])
+    assert response.status_code == 400
+    errors = response.json()['errors']
+    assert [error['code'] for error in errors] == ['bench2', 'bench8']
+    assert errors[1]['errors'] == {'code': ['Not editable']}
+    assert get_value(product, 'bench0') == before
+
+
+def test_batch_needs_edits(admin_client, products):
+    assert post_batch(admin_client, 'edits').status_code == 400
+
+
+def get_data(client, category):
+    url = reverse('product_tables_dashboard:product-table')
+    response = client.get(f'{url}json/{category.slug}/')
+    assert response.status_code == 200
+    if response.streaming:
+        return json.loads(b''.join(response.streaming_content))
+    return json.loads(response.content)
+
+
+def test_data_is_one_response_by_default(admin_client, category):
+    assert ProductTableDataView.streaming is False
+    data = get_data(admin_client, category)['data']
+    assert [row['productid'] for row in data] == list(
+        Product.objects.browsable_dashboard().values_list('pk', flat=True))
+
+
+def test_streamed_data_is_opt_in(admin_client, category, monkeypatch):
+    expected = get_data(admin_client, category)['data']
+    monkeypatch.setattr(ProductTableDataView, 'streaming', True)
+    data = get_data(admin_client, category)['data']
+    assert data == sorted(expected, key=lambda row: row['productid'])
@@ -0,0 +1,8 @@
+from django.apps import apps
+from django.urls import include, path
+
+urlpatterns = [
+    path('dashboard/product_tables/',
+         apps.get_app_config('product_tables_dashboard').urls),
+    path('', include(apps.get_app_config('oscar').urls[0])),
+]